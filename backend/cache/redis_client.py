@@ -3,18 +3,187 @@ Redis客户端 - 用于临时数据缓存
 """
 
 import redis
+import redis.asyncio
+import asyncio
 import json
 import pickle
 import gzip
 import pandas as pd
 import numpy as np
-from typing import Any, Optional, Dict, List
+import pyarrow as pa
+import pyarrow.ipc
+from typing import Any, Optional, Dict, List, Tuple, Union
 import logging
-from datetime import datetime, timedelta
+import socket
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from datetime import datetime
 import os
+import heapq
+import time
+from collections import OrderedDict
+
+try:
+    from redis.utils import HIREDIS_AVAILABLE
+except ImportError:
+    HIREDIS_AVAILABLE = False
+
+# 客户端缓存 (RESP3 tracking) 需要 redis-py>=6.0
+try:
+    from redis.cache import CacheConfig
+    HAS_CLIENT_CACHE = True
+except ImportError:
+    HAS_CLIENT_CACHE = False
+
+# 可选导入orjson库
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+
+# 可选导入msgpack库
+try:
+    import msgpack
+    HAS_MSGPACK = True
+except ImportError:
+    HAS_MSGPACK = False
+
+# 可选导入zstandard库
+try:
+    import zstandard as zstd
+    HAS_ZSTD = True
+except ImportError:
+    HAS_ZSTD = False
 
 logger = logging.getLogger(__name__)
 
+# DataFrame序列化格式头 (1字节)，旧的pickle+gzip数据以gzip魔数开头
+_DF_FORMAT_ARROW = b'A'        # Arrow IPC，Arrow内部压缩 (zstd/lz4)
+_DF_FORMAT_ARROW_ZSTD = b'Z'   # 未压缩Arrow IPC，外层zstd(可带字典)压缩
+_DF_FORMAT_ARROW_RAW = b'R'    # 未压缩Arrow IPC，格式头补齐到8字节使数据缓冲区对齐
+_RAW_HEADER = _DF_FORMAT_ARROW_RAW.ljust(8, b'\0')
+_GZIP_MAGIC = b'\x1f\x8b'
+
+ZSTD_LEVEL = 3
+
+# DataFrame压缩算法: zstd压缩率高；lz4解压更快，适合读多写少、带宽充足的部署；
+# none不压缩，读取时数值列直接引用Redis返回的字节 (零拷贝)，适合Redis在本机的部署
+DF_CODEC = os.getenv('REDIS_DF_CODEC', 'zstd').lower()
+
+# get_memory_usage 结果缓存时间(秒)，避免仪表盘轮询反复执行INFO
+MEMORY_USAGE_CACHE_SECONDS = 5
+
+# 活跃会话索引集合 (Redis SET)
+_ACTIVE_SET = "sessions:active"
+
+# 列式存储: 超过该大小(字节)的DataFrame按列拆分存入Redis Hash
+COLUMNAR_THRESHOLD = int(os.getenv('REDIS_COLUMNAR_THRESHOLD', 16 * 1024 * 1024))
+_SCHEMA_FIELD = b"__schema__"
+_INDEX_FIELD = b"__index__"
+
+# Arrow schema元数据中记录类型压缩方案的键
+_SHRINK_METADATA_KEY = b"modelsee.shrink"
+
+if HAS_ORJSON:
+    _ORJSON_OPTIONS = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+    
+    def _json_dumps(data: Any) -> bytes:
+        return orjson.dumps(data, default=str, option=_ORJSON_OPTIONS)
+    
+    _json_loads = orjson.loads
+else:
+    def _json_dumps(data: Any) -> bytes:
+        return json.dumps(data, ensure_ascii=False, default=str).encode('utf-8')
+    
+    _json_loads = json.loads
+
+# 字典数据编码: MessagePack数据带魔数前缀，JSON数据不带前缀 (JSON不会以0xDA开头)
+_MSGPACK_MAGIC = b'\xda'
+META_CODEC = os.getenv('REDIS_META_CODEC', 'msgpack' if HAS_MSGPACK else 'json').lower()
+
+def _msgpack_default(obj: Any) -> Any:
+    """处理MessagePack无法原生编码的类型，与JSON编码结果保持一致"""
+    if isinstance(obj, np.generic):
+        return obj.item()
+    if isinstance(obj, np.ndarray):
+        return obj.tolist()
+    if isinstance(obj, datetime):
+        return obj.isoformat()
+    return str(obj)
+
+def _encode_payload(data: Any, codec: str) -> bytes:
+    """按指定编码方式序列化字典数据"""
+    if codec == 'msgpack' and HAS_MSGPACK:
+        return _MSGPACK_MAGIC + msgpack.packb(data, use_bin_type=True, default=_msgpack_default)
+    return _json_dumps(data)
+
+def _decode_payload(blob: bytes) -> Any:
+    """反序列化字典数据，自动识别MessagePack/JSON"""
+    if blob[:1] == _MSGPACK_MAGIC:
+        return msgpack.unpackb(memoryview(blob)[1:], raw=False, strict_map_key=False)
+    return _json_loads(blob)
+
+def _version_tuple(version: str) -> Tuple[int, ...]:
+    """'6.2.14' -> (6, 2, 14)"""
+    return tuple(int(part) for part in version.split('.') if part.isdigit())
+
+def _session_id_from_key(key: bytes) -> bytes:
+    """从 b"session:<session_id>:<data_type>" 中取出session_id (partition比split少分配)"""
+    _, _, rest = key.partition(b':')
+    session_id, _, _ = rest.partition(b':')
+    return session_id
+
+def _keepalive_options() -> Dict[int, int]:
+    """TCP keepalive参数，保持池中空闲连接可用 (仅设置当前平台支持的选项)"""
+    options = {}
+    for name, value in (('TCP_KEEPIDLE', 60), ('TCP_KEEPINTVL', 10), ('TCP_KEEPCNT', 3)):
+        if hasattr(socket, name):
+            options[getattr(socket, name)] = value
+    return options
+
+def _shrink_df(df: pd.DataFrame) -> Tuple[pd.DataFrame, Dict[str, List[str]]]:
+    """
+    压缩DataFrame的数据类型以减小序列化体积
+    
+    整数列无损降为最小整数类型，浮点列降为float32 (有精度损失)，
+    低基数(唯一值占比<50%)的object列转为category
+    
+    Returns:
+        (压缩后的DataFrame, {列名: [原类型, 新类型]})
+    """
+    recipe = {}
+    shrunk_df = None
+    for col in df.columns:
+        series = df[col]
+        kind = series.dtype.kind
+        if kind in 'iu':
+            shrunk = pd.to_numeric(series, downcast='integer' if kind == 'i' else 'unsigned')
+        elif kind == 'f':
+            shrunk = pd.to_numeric(series, downcast='float')
+        elif kind == 'O' and len(series) > 0 and series.nunique() / len(series) < 0.5:
+            shrunk = series.astype('category')
+        else:
+            continue
+        if shrunk.dtype != series.dtype:
+            if shrunk_df is None:
+                shrunk_df = df.copy(deep=False)  # 浅拷贝，不修改调用方的DataFrame
+            shrunk_df[col] = shrunk
+            recipe[str(col)] = [str(series.dtype), str(shrunk.dtype)]
+    
+    return (shrunk_df if shrunk_df is not None else df), recipe
+
+def train_zstd_dictionary(samples: List[bytes], dict_size: int = 100_000) -> bytes:
+    """
+    基于代表性的会话数据训练zstd字典 (离线使用)
+    
+    训练结果写入文件后通过环境变量 REDIS_ZSTD_DICT_PATH 加载
+    """
+    if not HAS_ZSTD:
+        raise RuntimeError("需要安装zstandard库来训练字典")
+    return zstd.train_dictionary(dict_size, samples).as_bytes()
+
 class RedisDataCache:
     """Redis数据缓存管理器"""
     
@@ -35,78 +204,338 @@ class RedisDataCache:
             default_ttl: 默认过期时间(秒)
         """
         self.default_ttl = default_ttl
+        self._zdict = self._load_zstd_dictionary()
+        self._zstd_local = threading.local()
+        self._memory_usage_cache: Optional[Tuple[float, Dict[str, Any]]] = None
+        # 内存缓存模式下，事件循环和工作线程(asyncio.to_thread/编解码线程池)会同时读写缓存和过期堆
+        self._memory_lock = threading.Lock()
+        # DataFrame序列化/压缩是CPU密集操作，异步接口将其放到有界线程池中执行
+        self._codec_pool = ThreadPoolExecutor(
+            max_workers=min(8, os.cpu_count() or 1),
+            thread_name_prefix="redis-codec"
+        )
         
         try:
-            self.redis_client = redis.Redis(
+            # 显式连接池：并发请求复用连接，池满时阻塞等待而不是报错
+            pool_kwargs = dict(
                 host=host,
                 port=port,
                 db=db,
                 password=password,
+                max_connections=int(os.getenv('REDIS_POOL_MAX', 32)),
+                timeout=5,  # 等待空闲连接的超时
                 decode_responses=False,  # 处理二进制数据
                 socket_timeout=5,
                 socket_connect_timeout=5,
+                socket_keepalive=True,
+                socket_keepalive_options=_keepalive_options(),
                 retry_on_timeout=True
             )
+            self.redis_client = redis.Redis(connection_pool=redis.BlockingConnectionPool(**pool_kwargs))
+            # 异步客户端用于异步接口的网络读写，连接在首次使用时建立
+            self._aredis = redis.asyncio.Redis(
+                connection_pool=redis.asyncio.BlockingConnectionPool(**pool_kwargs)
+            )
+            # 订阅连接长时间阻塞等待消息，使用独立的连接池且不设读超时
+            self._apubsub_redis = redis.asyncio.Redis(
+                connection_pool=redis.asyncio.BlockingConnectionPool(
+                    **{**pool_kwargs, 'max_connections': 4, 'socket_timeout': None}
+                )
+            )
+            
+            if not HIREDIS_AVAILABLE:
+                logger.warning("未安装hiredis，Redis响应将使用纯Python解析")
             
             # 测试连接
             self.redis_client.ping()
+            redis_version = self.redis_client.info('server').get('redis_version', '0')
+            self._supports_unlink = _version_tuple(redis_version) >= (4, 0)
+            self._cached_client = self._create_cached_client(pool_kwargs)
+            if not self.redis_client.exists(_ACTIVE_SET):
+                self._rebuild_active_sessions_index()
             logger.info(f"Redis连接成功: {host}:{port}/{db}")
             
         except redis.ConnectionError as e:
             logger.error(f"Redis连接失败: {e}")
             # 降级到内存缓存
             self.redis_client = None
-            self._memory_cache = {}
+            self._aredis = None
+            self._apubsub_redis = None
+            self._cached_client = None
+            # 内存缓存: OrderedDict按访问顺序实现LRU淘汰，最小堆按过期时间惰性清理
+            self._memory_cache: "OrderedDict[bytes, Dict[str, Any]]" = OrderedDict()
+            self._expiry_heap: List[tuple] = []
+            self._memory_max_entries = int(os.getenv('MEMORY_CACHE_MAX_ENTRIES', 1024))
             logger.warning("降级使用内存缓存")
+        
+        self._bind_storage_backend()
+    
+    def _bind_storage_backend(self):
+        """
+        按连接结果绑定高频读写方法的具体实现
+        
+        Redis/内存模式在初始化后不再变化，绑定一次即可省去每次调用时的分支判断
+        """
+        if self._is_redis_available():
+            self.store_dataframe = self._store_dataframe_redis
+            self.get_dataframe = self._get_dataframe_redis
+            self.store_packed = self._store_packed_redis
+            self.get_packed = self._get_packed_redis
+        else:
+            self.store_dataframe = self._store_dataframe_memory
+            self.get_dataframe = self._get_dataframe_memory
+            self.store_packed = self._store_packed_memory
+            self.get_packed = self._get_packed_memory
+    
+    def _create_cached_client(self, pool_kwargs: Dict[str, Any]) -> Optional[redis.Redis]:
+        """
+        创建启用客户端缓存的Redis客户端 (RESP3 tracking)
+        
+        读取结果缓存在进程内，键被任意客户端修改时由Redis推送失效通知；
+        只用于读多写少的会话信息/数据元信息，REDIS_CLIENT_CACHE=0 可关闭
+        """
+        if not HAS_CLIENT_CACHE or os.getenv('REDIS_CLIENT_CACHE', '1') == '0':
+            return None
+        try:
+            client = redis.Redis(connection_pool=redis.BlockingConnectionPool(
+                **pool_kwargs,
+                protocol=3,
+                cache_config=CacheConfig(max_size=int(os.getenv('REDIS_CLIENT_CACHE_SIZE', 1024)))
+            ))
+            client.ping()
+            logger.info("Redis客户端缓存已启用")
+            return client
+        except Exception as e:
+            logger.warning(f"Redis客户端缓存不可用 (需要Redis 6+): {e}")
+            return None
+    
+    def _memory_set(self, key: bytes, data: bytes, ttl: int):
+        """写入内存缓存，超过容量上限时淘汰最久未使用的条目"""
+        expires_at = time.time() + ttl
+        with self._memory_lock:
+            self._memory_cache[key] = {'data': data, 'expires_at': expires_at}
+            self._memory_cache.move_to_end(key)
+            heapq.heappush(self._expiry_heap, (expires_at, key))
+            while len(self._memory_cache) > self._memory_max_entries:
+                self._memory_cache.popitem(last=False)
+            # 覆盖写入/淘汰会在堆中留下失效记录，堆明显大于缓存时重建
+            if len(self._expiry_heap) > 4 * self._memory_max_entries:
+                self._expiry_heap = [(entry['expires_at'], k) for k, entry in self._memory_cache.items()]
+                heapq.heapify(self._expiry_heap)
+    
+    def _memory_get(self, key: bytes) -> Optional[bytes]:
+        """读取内存缓存，过期条目直接删除"""
+        with self._memory_lock:
+            cache_entry = self._memory_cache.get(key)
+            if cache_entry is None:
+                return None
+            if cache_entry['expires_at'] <= time.time():
+                del self._memory_cache[key]
+                return None
+            self._memory_cache.move_to_end(key)
+            return cache_entry['data']
     
     def _is_redis_available(self) -> bool:
         """检查Redis是否可用"""
         return self.redis_client is not None
     
-    def _get_key(self, session_id: str, data_type: str) -> str:
-        """生成Redis键"""
-        return f"session:{session_id}:{data_type}"
+    @staticmethod
+    @lru_cache(maxsize=8192)
+    def _get_key(session_id: str, data_type: str) -> bytes:
+        """生成Redis键 (缓存结果；返回bytes，redis-py无需每次重新编码)"""
+        return f"session:{session_id}:{data_type}".encode('utf-8')
+    
+    def _load_zstd_dictionary(self) -> Optional["zstd.ZstdCompressionDict"]:
+        """从 REDIS_ZSTD_DICT_PATH 加载预训练的zstd字典"""
+        dict_path = os.getenv('REDIS_ZSTD_DICT_PATH')
+        if not HAS_ZSTD or not dict_path:
+            return None
+        try:
+            with open(dict_path, 'rb') as f:
+                zdict = zstd.ZstdCompressionDict(f.read())
+            zdict.precompute_compress(level=ZSTD_LEVEL)
+            logger.info(f"已加载zstd字典: {dict_path}")
+            return zdict
+        except Exception as e:
+            logger.warning(f"加载zstd字典失败，使用无字典压缩: {e}")
+            return None
+    
+    def _zstd_contexts(self):
+        """获取当前线程的zstd压缩/解压上下文 (上下文不可跨线程并发使用)"""
+        local = self._zstd_local
+        if not hasattr(local, 'compressor'):
+            local.compressor = zstd.ZstdCompressor(level=ZSTD_LEVEL, dict_data=self._zdict)
+            local.decompressor = zstd.ZstdDecompressor(dict_data=self._zdict)
+        return local.compressor, local.decompressor
+    
+    def _encode_dataframe(self, df: pd.DataFrame, shrink_recipe: Optional[Dict[str, List[str]]] = None) -> Union[bytes, memoryview]:
+        """
+        DataFrame -> Arrow IPC 字节流 (zstd/lz4压缩)，类型压缩记录写入schema元数据
+        
+        Arrow内部压缩时直接返回输出缓冲区的memoryview (redis-py原样发送memoryview)，
+        不再复制为bytes
+        """
+        table = pa.Table.from_pandas(df, preserve_index=True)
+        if shrink_recipe:
+            metadata = dict(table.schema.metadata or {})
+            metadata[_SHRINK_METADATA_KEY] = json.dumps(shrink_recipe).encode('utf-8')
+            table = table.replace_schema_metadata(metadata)
+        sink = pa.BufferOutputStream()
+        if DF_CODEC == 'none':
+            sink.write(_RAW_HEADER)
+            with pa.ipc.new_stream(sink, table.schema) as writer:
+                writer.write_table(table)
+            return memoryview(sink.getvalue())
+        
+        if HAS_ZSTD and DF_CODEC != 'lz4':
+            with pa.ipc.new_stream(sink, table.schema) as writer:
+                writer.write_table(table)
+            compressor, _ = self._zstd_contexts()
+            return _DF_FORMAT_ARROW_ZSTD + compressor.compress(sink.getvalue())
+        
+        # 格式头直接写入输出流，避免拼接时再复制一次整个数据
+        sink.write(_DF_FORMAT_ARROW)
+        options = pa.ipc.IpcWriteOptions(compression='lz4' if DF_CODEC == 'lz4' else 'zstd')
+        with pa.ipc.new_stream(sink, table.schema, options=options) as writer:
+            writer.write_table(table)
+        return memoryview(sink.getvalue())
+    
+    def _decode_dataframe(self, blob: bytes) -> pd.DataFrame:
+        """字节流 -> DataFrame，兼容旧的pickle+gzip格式"""
+        codec = blob[:1]
+        if codec == _DF_FORMAT_ARROW_ZSTD:
+            # zstd帧头记录了原始大小，解压时一次性分配输出缓冲区；
+            # memoryview切片避免为去掉格式头而复制压缩数据
+            _, decompressor = self._zstd_contexts()
+            payload = decompressor.decompress(memoryview(blob)[1:])
+        elif codec == _DF_FORMAT_ARROW:
+            payload = memoryview(blob)[1:]
+        elif codec == _DF_FORMAT_ARROW_RAW:
+            # 无需解压，定长且无缺失值的列转换为pandas后仍引用blob本身的内存 (只读)
+            payload = memoryview(blob)[len(_RAW_HEADER):]
+        elif blob[:2] == _GZIP_MAGIC:
+            return pickle.loads(gzip.decompress(blob))
+        else:
+            raise ValueError(f"未知的DataFrame序列化格式: {codec!r}")
+        # Arrow直接引用payload内存，转换为pandas时逐列释放Arrow缓冲区，避免同时持有两份数据
+        table = pa.ipc.open_stream(pa.BufferReader(payload)).read_all()
+        return table.to_pandas(split_blocks=True, self_destruct=True)
     
     # ==================== 数据存储方法 ====================
     
-    def store_dataframe(self, session_id: str, data_type: str, df: pd.DataFrame, ttl: Optional[int] = None) -> bool:
+    def _store_dataframe_redis(self, 
+                               session_id: str, 
+                               data_type: str, 
+                               df: pd.DataFrame, 
+                               ttl: Optional[int] = None,
+                               shrink: bool = False) -> bool:
         """
-        存储Pandas DataFrame
+        存储Pandas DataFrame到Redis (store_dataframe的Redis实现)
         
         Args:
             session_id: 会话ID
             data_type: 数据类型 (raw_data, processed_data等)
             df: DataFrame对象
             ttl: 过期时间(秒)，None使用默认值
+            shrink: 是否压缩数据类型 (浮点降为float32有精度损失，需显式开启)
         """
         try:
             key = self._get_key(session_id, data_type)
             ttl = ttl or self.default_ttl
             
-            # 序列化和压缩DataFrame
-            serialized_data = pickle.dumps(df)
-            compressed_data = gzip.compress(serialized_data)
+            recipe = None
+            if shrink:
+                df, recipe = _shrink_df(df)
+            
+            if self._use_columnar(df):
+                return self.store_dataframe_columnar(session_id, data_type, df, ttl, shrink_recipe=recipe)
+            
+            # 序列化为Arrow IPC (内置zstd压缩)
+            compressed_data = self._encode_dataframe(df, recipe)
+            
+            pipe = self.redis_client.pipeline(transaction=False)
+            pipe.setex(key, ttl, compressed_data)
+            pipe.delete(self._get_columnar_key(session_id, data_type))  # 清理旧的列式数据
+            pipe.execute()
+            logger.debug(f"DataFrame存储到Redis: {key}, 大小: {len(compressed_data)} bytes")
+            return True
+            
+        except Exception as e:
+            logger.error(f"存储DataFrame失败: {e}")
+            return False
+    
+    def _store_dataframe_memory(self, 
+                                session_id: str, 
+                                data_type: str, 
+                                df: pd.DataFrame, 
+                                ttl: Optional[int] = None,
+                                shrink: bool = False) -> bool:
+        """存储Pandas DataFrame到内存缓存 (store_dataframe的降级实现)"""
+        try:
+            key = self._get_key(session_id, data_type)
+            ttl = ttl or self.default_ttl
+            
+            recipe = None
+            if shrink:
+                df, recipe = _shrink_df(df)
+            
+            self._memory_set(key, self._encode_dataframe(df, recipe), ttl)
+            logger.debug(f"DataFrame存储到内存缓存: {key}")
+            return True
+            
+        except Exception as e:
+            logger.error(f"存储DataFrame失败: {e}")
+            return False
+    
+    def store_many(self, session_id: str, items: Dict[str, Any], ttl: Optional[int] = None) -> bool:
+        """
+        批量存储会话的多个数据项 (Redis下通过pipeline一次往返完成)
+        
+        包含 "info" 时与 store_session_info 一样同时登记到活跃会话索引；
+        DataFrame与 store_dataframe 一样，较大时按列存储，并删除另一种存储布局的旧数据
+        
+        Args:
+            session_id: 会话ID
+            items: {数据类型: DataFrame或字典数据}
+            ttl: 过期时间(秒)
+        """
+        try:
+            ttl = ttl or self.default_ttl
             
             if self._is_redis_available():
-                self.redis_client.setex(key, ttl, compressed_data)
-                logger.debug(f"DataFrame存储到Redis: {key}, 大小: {len(compressed_data)} bytes")
+                pipe = self.redis_client.pipeline(transaction=False)
+                for data_type, value in items.items():
+                    key = self._get_key(session_id, data_type)
+                    if not isinstance(value, pd.DataFrame):
+                        pipe.setex(key, ttl, _encode_payload(value, META_CODEC))
+                        continue
+                    hkey = self._get_columnar_key(session_id, data_type)
+                    if self._use_columnar(value):
+                        pipe.delete(key, hkey)
+                        pipe.hset(hkey, mapping=self._columnar_mapping(value))
+                        pipe.expire(hkey, ttl)
+                    else:
+                        pipe.setex(key, ttl, self._encode_dataframe(value))
+                        pipe.delete(hkey)  # 清理旧的列式数据
+                if "info" in items:
+                    pipe.sadd(_ACTIVE_SET, session_id)
+                pipe.execute()
             else:
-                # 降级到内存缓存
-                self._memory_cache[key] = {
-                    'data': compressed_data,
-                    'expires_at': datetime.now() + timedelta(seconds=ttl)
-                }
-                logger.debug(f"DataFrame存储到内存缓存: {key}")
+                for data_type, value in items.items():
+                    blob = (self._encode_dataframe(value) if isinstance(value, pd.DataFrame)
+                            else _encode_payload(value, META_CODEC))
+                    self._memory_set(self._get_key(session_id, data_type), blob, ttl)
             
+            logger.debug(f"批量存储会话 {session_id}: {list(items.keys())}")
             return True
             
         except Exception as e:
-            logger.error(f"存储DataFrame失败: {e}")
+            logger.error(f"批量存储失败: {e}")
             return False
     
-    def get_dataframe(self, session_id: str, data_type: str) -> Optional[pd.DataFrame]:
+    def _get_dataframe_redis(self, session_id: str, data_type: str) -> Optional[pd.DataFrame]:
         """
-        获取Pandas DataFrame
+        从Redis获取Pandas DataFrame (get_dataframe的Redis实现)
         
         Args:
             session_id: 会话ID
@@ -117,25 +546,95 @@ class RedisDataCache:
         """
         try:
             key = self._get_key(session_id, data_type)
+            compressed_data = self.redis_client.get(key)
+            if compressed_data is None:
+                # 大DataFrame按列存储
+                return self._read_columnar(session_id, data_type)
+            
+            # 反序列化 (兼容旧的pickle+gzip数据)
+            df = self._decode_dataframe(compressed_data)
+            
+            logger.debug(f"从缓存获取DataFrame: {key}, 形状: {df.shape}")
+            return df
+            
+        except Exception as e:
+            logger.error(f"获取DataFrame失败: {e}")
+            return None
+    
+    def _get_dataframe_memory(self, session_id: str, data_type: str) -> Optional[pd.DataFrame]:
+        """从内存缓存获取Pandas DataFrame (get_dataframe的降级实现)"""
+        try:
+            key = self._get_key(session_id, data_type)
+            compressed_data = self._memory_get(key)
+            if compressed_data is None:
+                return None
+            
+            df = self._decode_dataframe(compressed_data)
+            
+            logger.debug(f"从缓存获取DataFrame: {key}, 形状: {df.shape}")
+            return df
+            
+        except Exception as e:
+            logger.error(f"获取DataFrame失败: {e}")
+            return None
+    
+    async def astore_dataframe(self, 
+                               session_id: str, 
+                               data_type: str, 
+                               df: pd.DataFrame, 
+                               ttl: Optional[int] = None,
+                               shrink: bool = False) -> bool:
+        """store_dataframe的异步版本，序列化在线程池中执行，不阻塞事件循环"""
+        try:
+            key = self._get_key(session_id, data_type)
+            ttl = ttl or self.default_ttl
+            
+            loop = asyncio.get_running_loop()
+            recipe = None
+            if shrink:
+                df, recipe = await loop.run_in_executor(self._codec_pool, _shrink_df, df)
+            
+            if self._use_columnar(df):
+                return await loop.run_in_executor(
+                    self._codec_pool, self.store_dataframe_columnar, session_id, data_type, df, ttl, recipe
+                )
+            compressed_data = await loop.run_in_executor(self._codec_pool, self._encode_dataframe, df, recipe)
             
             if self._is_redis_available():
-                compressed_data = self.redis_client.get(key)
+                pipe = self._aredis.pipeline(transaction=False)
+                pipe.setex(key, ttl, compressed_data)
+                pipe.delete(self._get_columnar_key(session_id, data_type))  # 清理旧的列式数据
+                await pipe.execute()
+                logger.debug(f"DataFrame存储到Redis: {key}, 大小: {len(compressed_data)} bytes")
             else:
-                # 从内存缓存获取
-                cache_entry = self._memory_cache.get(key)
-                if cache_entry and cache_entry['expires_at'] > datetime.now():
-                    compressed_data = cache_entry['data']
-                else:
-                    compressed_data = None
-                    if cache_entry:  # 过期数据清理
-                        del self._memory_cache[key]
+                self._memory_set(key, compressed_data, ttl)
+                logger.debug(f"DataFrame存储到内存缓存: {key}")
+            
+            return True
+            
+        except Exception as e:
+            logger.error(f"存储DataFrame失败: {e}")
+            return False
+    
+    async def aget_dataframe(self, session_id: str, data_type: str) -> Optional[pd.DataFrame]:
+        """get_dataframe的异步版本，反序列化在线程池中执行，不阻塞事件循环"""
+        try:
+            key = self._get_key(session_id, data_type)
+            
+            loop = asyncio.get_running_loop()
+            if self._is_redis_available():
+                compressed_data = await self._aredis.get(key)
+                if compressed_data is None:
+                    return await loop.run_in_executor(
+                        self._codec_pool, self._read_columnar, session_id, data_type
+                    )
+            else:
+                compressed_data = self._memory_get(key)
             
             if compressed_data is None:
                 return None
             
-            # 解压缩和反序列化
-            serialized_data = gzip.decompress(compressed_data)
-            df = pickle.loads(serialized_data)
+            df = await loop.run_in_executor(self._codec_pool, self._decode_dataframe, compressed_data)
             
             logger.debug(f"从缓存获取DataFrame: {key}, 形状: {df.shape}")
             return df
@@ -144,78 +643,330 @@ class RedisDataCache:
             logger.error(f"获取DataFrame失败: {e}")
             return None
     
-    def store_json(self, session_id: str, data_type: str, data: Dict, ttl: Optional[int] = None) -> bool:
+    # ==================== 列式存储方法 ====================
+    
+    @staticmethod
+    def _get_columnar_key(session_id: str, data_type: str) -> bytes:
+        """列式DataFrame的Hash键"""
+        return RedisDataCache._get_key(session_id, f"df:{data_type}")
+    
+    def _use_columnar(self, df: pd.DataFrame) -> bool:
+        """大DataFrame且列名唯一时使用列式存储"""
+        return (self._is_redis_available()
+                and df.columns.is_unique
+                and int(df.memory_usage(index=False).sum()) >= COLUMNAR_THRESHOLD)
+    
+    def store_dataframe_columnar(self, 
+                                 session_id: str, 
+                                 data_type: str, 
+                                 df: pd.DataFrame, 
+                                 ttl: Optional[int] = None,
+                                 shrink_recipe: Optional[Dict[str, List[str]]] = None) -> bool:
+        """
+        按列存储DataFrame到Redis Hash，支持只读取部分列
+        
+        Hash字段: 每列一个Arrow IPC数据块 (字段名为str(列名))，
+        __index__ 保存索引，__schema__ 保存列名/类型/形状及类型压缩方案
         """
-        存储JSON数据
+        if not self._is_redis_available():
+            return self.store_dataframe(session_id, data_type, df, ttl)
+        
+        try:
+            if not df.columns.is_unique:
+                raise ValueError("列式存储要求列名唯一")
+            
+            hkey = self._get_columnar_key(session_id, data_type)
+            ttl = ttl or self.default_ttl
+            mapping = self._columnar_mapping(df, shrink_recipe)
+            
+            pipe = self.redis_client.pipeline(transaction=False)
+            pipe.delete(self._get_key(session_id, data_type), hkey)
+            pipe.hset(hkey, mapping=mapping)
+            pipe.expire(hkey, ttl)
+            pipe.execute()
+            
+            logger.debug(f"DataFrame按列存储到Redis: {hkey}, 列数: {len(df.columns)}")
+            return True
+            
+        except Exception as e:
+            logger.error(f"列式存储DataFrame失败: {e}")
+            return False
+    
+    def _columnar_mapping(self, 
+                          df: pd.DataFrame, 
+                          shrink_recipe: Optional[Dict[str, List[str]]] = None) -> Dict[Union[str, bytes], Any]:
+        """生成列式存储的Hash字段 (schema、索引和每列的数据块)"""
+        schema = {
+            'columns': [str(col) for col in df.columns],
+            'dtypes': {str(col): str(dtype) for col, dtype in df.dtypes.items()},
+            'shape': list(df.shape),
+            'shrink': shrink_recipe or {}
+        }
+        mapping = {
+            _SCHEMA_FIELD: _encode_payload(schema, META_CODEC),
+            _INDEX_FIELD: self._encode_dataframe(df.iloc[:, :0])
+        }
+        for col in df.columns:
+            mapping[str(col)] = self._encode_dataframe(df[[col]].reset_index(drop=True))
+        return mapping
+    
+    def _read_columnar(self, 
+                       session_id: str, 
+                       data_type: str, 
+                       columns: Optional[List[str]] = None) -> Optional[pd.DataFrame]:
+        """读取列式存储的DataFrame (columns为None时读取全部列)"""
+        hkey = self._get_columnar_key(session_id, data_type)
+        if columns is None:
+            fields = self.redis_client.hgetall(hkey)
+            if not fields:
+                return None
+            schema = _decode_payload(fields[_SCHEMA_FIELD])
+            columns = schema['columns']
+            blobs = [fields[col.encode('utf-8')] for col in columns]
+            index_blob = fields[_INDEX_FIELD]
+        else:
+            values = self.redis_client.hmget(hkey, [_INDEX_FIELD] + [str(col) for col in columns])
+            index_blob, blobs = values[0], values[1:]
+            if index_blob is None:
+                return None
+            missing = [col for col, blob in zip(columns, blobs) if blob is None]
+            if missing:
+                raise KeyError(f"列不存在: {missing}")
+        
+        index = self._decode_dataframe(index_blob).index
+        if not blobs:
+            return pd.DataFrame(index=index)
+        df = pd.concat([self._decode_dataframe(blob) for blob in blobs], axis=1)
+        df.index = index
+        return df
+    
+    def get_dataframe_columns(self, 
+                              session_id: str, 
+                              data_type: str, 
+                              columns: List[str]) -> Optional[pd.DataFrame]:
+        """
+        只获取DataFrame的指定列
+        
+        列式存储时通过HMGET只传输所需列；否则读取整个DataFrame后选择列
+        """
+        try:
+            if self._is_redis_available():
+                df = self._read_columnar(session_id, data_type, columns)
+                if df is not None:
+                    return df
+            
+            df = self.get_dataframe(session_id, data_type)
+            return df[columns] if df is not None else None
+            
+        except Exception as e:
+            logger.error(f"获取DataFrame列失败: {e}")
+            return None
+    
+    def get_dataframe_schema(self, session_id: str, data_type: str) -> Optional[Dict[str, Any]]:
+        """获取列式存储DataFrame的列名/类型/形状，无需读取数据"""
+        try:
+            if not self._is_redis_available():
+                return None
+            blob = self.redis_client.hget(self._get_columnar_key(session_id, data_type), _SCHEMA_FIELD)
+            return _decode_payload(blob) if blob is not None else None
+        except Exception as e:
+            logger.error(f"获取DataFrame结构失败: {e}")
+            return None
+    
+    def has_dataframes(self, session_id: str, data_types: List[str]) -> Dict[str, bool]:
+        """批量检查DataFrame是否存在 (只检查键，不传输和反序列化数据)"""
+        try:
+            if self._is_redis_available():
+                pipe = self.redis_client.pipeline(transaction=False)
+                for data_type in data_types:
+                    pipe.exists(self._get_key(session_id, data_type), self._get_columnar_key(session_id, data_type))
+                return {data_type: count > 0 for data_type, count in zip(data_types, pipe.execute())}
+            
+            return {data_type: self._memory_get(self._get_key(session_id, data_type)) is not None
+                    for data_type in data_types}
+            
+        except Exception as e:
+            logger.error(f"检查DataFrame是否存在失败: {e}")
+            return {data_type: False for data_type in data_types}
+    
+    # ==================== 字典数据存储方法 ====================
+    
+    def _store_packed_redis(self, 
+                            session_id: str, 
+                            data_type: str, 
+                            data: Dict, 
+                            ttl: Optional[int] = None,
+                            codec: Optional[str] = None) -> bool:
+        """
+        存储字典数据到Redis (store_packed的Redis实现，默认MessagePack编码)
         
         Args:
             session_id: 会话ID
             data_type: 数据类型
             data: 字典数据
             ttl: 过期时间(秒)
+            codec: 编码方式 ('msgpack' / 'json')，None使用 REDIS_META_CODEC
         """
         try:
             key = self._get_key(session_id, data_type)
-            ttl = ttl or self.default_ttl
-            json_data = json.dumps(data, ensure_ascii=False, default=str)
-            
-            if self._is_redis_available():
-                self.redis_client.setex(key, ttl, json_data)
-            else:
-                self._memory_cache[key] = {
-                    'data': json_data,
-                    'expires_at': datetime.now() + timedelta(seconds=ttl)
-                }
-            
-            logger.debug(f"JSON数据存储: {key}")
+            self.redis_client.setex(key, ttl or self.default_ttl, _encode_payload(data, codec or META_CODEC))
+            logger.debug(f"字典数据存储: {key}")
             return True
             
         except Exception as e:
-            logger.error(f"存储JSON失败: {e}")
+            logger.error(f"存储字典数据失败: {e}")
             return False
     
-    def get_json(self, session_id: str, data_type: str) -> Optional[Dict]:
-        """获取JSON数据"""
+    def _store_packed_memory(self, 
+                             session_id: str, 
+                             data_type: str, 
+                             data: Dict, 
+                             ttl: Optional[int] = None,
+                             codec: Optional[str] = None) -> bool:
+        """存储字典数据到内存缓存 (store_packed的降级实现)"""
         try:
             key = self._get_key(session_id, data_type)
+            self._memory_set(key, _encode_payload(data, codec or META_CODEC), ttl or self.default_ttl)
+            logger.debug(f"字典数据存储: {key}")
+            return True
             
-            if self._is_redis_available():
-                json_data = self.redis_client.get(key)
-                if json_data:
-                    json_data = json_data.decode('utf-8')
-            else:
-                cache_entry = self._memory_cache.get(key)
-                if cache_entry and cache_entry['expires_at'] > datetime.now():
-                    json_data = cache_entry['data']
-                else:
-                    json_data = None
-                    if cache_entry:
-                        del self._memory_cache[key]
-            
-            if json_data is None:
+        except Exception as e:
+            logger.error(f"存储字典数据失败: {e}")
+            return False
+    
+    def _get_packed_redis(self, session_id: str, data_type: str, cached: bool = False) -> Optional[Dict]:
+        """
+        从Redis获取字典数据 (get_packed的Redis实现，自动识别MessagePack/JSON编码)
+        
+        Args:
+            session_id: 会话ID
+            data_type: 数据类型
+            cached: 是否通过客户端缓存读取 (仅用于读多写少的数据)
+        """
+        try:
+            client = self._cached_client if cached and self._cached_client else self.redis_client
+            packed_data = client.get(self._get_key(session_id, data_type))
+            if packed_data is None:
                 return None
+            return _decode_payload(packed_data)
             
-            return json.loads(json_data)
+        except Exception as e:
+            logger.error(f"获取字典数据失败: {e}")
+            return None
+    
+    def _get_packed_memory(self, session_id: str, data_type: str, cached: bool = False) -> Optional[Dict]:
+        """从内存缓存获取字典数据 (get_packed的降级实现，cached参数无效)"""
+        try:
+            packed_data = self._memory_get(self._get_key(session_id, data_type))
+            if packed_data is None:
+                return None
+            return _decode_payload(packed_data)
             
         except Exception as e:
-            logger.error(f"获取JSON失败: {e}")
+            logger.error(f"获取字典数据失败: {e}")
             return None
     
+    def store_json(self, session_id: str, data_type: str, data: Dict, ttl: Optional[int] = None) -> bool:
+        """存储JSON数据 (供需要直接读取JSON的外部使用方)"""
+        return self.store_packed(session_id, data_type, data, ttl, codec='json')
+    
+    def get_json(self, session_id: str, data_type: str) -> Optional[Dict]:
+        """获取JSON数据"""
+        return self.get_packed(session_id, data_type)
+    
     # ==================== 会话管理方法 ====================
     
     def store_session_info(self, session_id: str, info: Dict, ttl: Optional[int] = None) -> bool:
-        """存储会话信息"""
-        return self.store_json(session_id, "info", info, ttl)
+        """存储会话信息，并登记到活跃会话索引"""
+        if not self._is_redis_available():
+            return self.store_packed(session_id, "info", info, ttl)
+        
+        try:
+            pipe = self.redis_client.pipeline(transaction=False)
+            pipe.setex(self._get_key(session_id, "info"), ttl or self.default_ttl,
+                       _encode_payload(info, META_CODEC))
+            pipe.sadd(_ACTIVE_SET, session_id)
+            pipe.execute()
+            return True
+        except Exception as e:
+            logger.error(f"存储会话信息失败: {e}")
+            return False
     
     def get_session_info(self, session_id: str) -> Optional[Dict]:
-        """获取会话信息"""
-        return self.get_json(session_id, "info")
+        """获取会话信息 (Redis下合并单独存储的 last_accessed)"""
+        if not self._is_redis_available():
+            return self.get_packed(session_id, "info")
+        
+        try:
+            client = self._cached_client or self.redis_client
+            info_data, last_accessed = client.mget(
+                self._get_key(session_id, "info"),
+                self._get_key(session_id, "last_accessed")
+            )
+            if info_data is None:
+                return None
+            
+            info = _decode_payload(info_data)
+            if last_accessed is not None:
+                info['last_accessed'] = last_accessed.decode('utf-8')
+            return info
+            
+        except Exception as e:
+            logger.error(f"获取会话信息失败: {e}")
+            return None
+    
+    def get_session_infos_bulk(self, session_ids: List[str]) -> List[Optional[Dict]]:
+        """
+        批量获取会话信息，结果与 session_ids 一一对应，不存在的会话为None
+        
+        Redis下所有会话的 info 和 last_accessed 在一次MGET中读取
+        """
+        if not session_ids:
+            return []
+        if not self._is_redis_available():
+            return [self.get_packed(session_id, "info") for session_id in session_ids]
+        
+        try:
+            client = self._cached_client or self.redis_client
+            keys = []
+            for session_id in session_ids:
+                keys.append(self._get_key(session_id, "info"))
+                keys.append(self._get_key(session_id, "last_accessed"))
+            values = client.mget(keys)
+            
+            infos = []
+            for info_data, last_accessed in zip(values[0::2], values[1::2]):
+                if info_data is None:
+                    infos.append(None)
+                    continue
+                info = _decode_payload(info_data)
+                if last_accessed is not None:
+                    info['last_accessed'] = last_accessed.decode('utf-8')
+                infos.append(info)
+            return infos
+            
+        except Exception as e:
+            logger.error(f"批量获取会话信息失败: {e}")
+            return [None] * len(session_ids)
     
     def update_session_access(self, session_id: str) -> bool:
-        """更新会话最后访问时间"""
+        """
+        更新会话最后访问时间
+        
+        Redis下 last_accessed 单独存为小键，一次往返内写入并刷新会话信息的过期时间，
+        无需读取-修改-写回会话信息，也就没有并发更新丢失的问题
+        """
         try:
+            now = datetime.now().isoformat()
+            if self._is_redis_available():
+                pipe = self.redis_client.pipeline(transaction=False)
+                pipe.set(self._get_key(session_id, "last_accessed"), now, ex=self.default_ttl)
+                pipe.expire(self._get_key(session_id, "info"), self.default_ttl)
+                _, info_exists = pipe.execute()
+                return bool(info_exists)
+            
             info = self.get_session_info(session_id) or {}
-            info['last_accessed'] = datetime.now().isoformat()
+            info['last_accessed'] = now
             return self.store_session_info(session_id, info)
         except Exception as e:
             logger.error(f"更新会话访问时间失败: {e}")
@@ -223,45 +974,50 @@ class RedisDataCache:
     
     def store_processing_progress(self, session_id: str, progress: Dict, ttl: Optional[int] = None) -> bool:
         """存储处理进度"""
-        return self.store_json(session_id, "processing_progress", progress, ttl)
+        return self.store_packed(session_id, "processing_progress", progress, ttl)
     
     def get_processing_progress(self, session_id: str) -> Optional[Dict]:
         """获取处理进度"""
-        return self.get_json(session_id, "processing_progress")
+        return self.get_packed(session_id, "processing_progress")
     
     # ==================== 数据管理方法 ====================
     
     def store_data_metadata(self, session_id: str, metadata: Dict, ttl: Optional[int] = None) -> bool:
         """存储数据元信息"""
-        return self.store_json(session_id, "metadata", metadata, ttl)
+        return self.store_packed(session_id, "metadata", metadata, ttl)
     
     def get_data_metadata(self, session_id: str) -> Optional[Dict]:
         """获取数据元信息"""
-        return self.get_json(session_id, "metadata")
+        return self.get_packed(session_id, "metadata", cached=True)
     
     def clear_session_data(self, session_id: str) -> bool:
-        """清理会话的所有数据"""
+        """
+        清理会话的所有数据
+        
+        通过SCAN收集 session:<id>:* 下的全部键 (包括列式存储等非固定类型的键)；
+        Redis 4.0+ 使用UNLINK在后台线程释放内存，删除大DataFrame时不会阻塞Redis
+        """
         try:
-            # 数据类型列表
-            data_types = [
-                "info", "raw_data", "processed_data", "metadata", 
-                "processing_progress", "training_progress", "model_structure"
-            ]
+            keys_to_delete = self.get_session_keys(session_id)
             
             if self._is_redis_available():
-                keys_to_delete = [self._get_key(session_id, dt) for dt in data_types]
                 # 批量删除
+                pipe = self.redis_client.pipeline(transaction=False)
                 if keys_to_delete:
-                    deleted_count = self.redis_client.delete(*keys_to_delete)
-                    logger.info(f"Redis清理会话 {session_id}: 删除了 {deleted_count} 个键")
+                    if self._supports_unlink:
+                        pipe.unlink(*keys_to_delete)
+                    else:
+                        pipe.delete(*keys_to_delete)
+                pipe.srem(_ACTIVE_SET, session_id)
+                results = pipe.execute()
+                deleted_count = results[0] if keys_to_delete else 0
+                logger.info(f"Redis清理会话 {session_id}: 删除了 {deleted_count} 个键")
             else:
                 # 内存缓存清理
-                deleted_count = 0
-                for dt in data_types:
-                    key = self._get_key(session_id, dt)
-                    if key in self._memory_cache:
-                        del self._memory_cache[key]
-                        deleted_count += 1
+                with self._memory_lock:
+                    for key in keys_to_delete:
+                        self._memory_cache.pop(key, None)
+                deleted_count = len(keys_to_delete)
                 logger.info(f"内存缓存清理会话 {session_id}: 删除了 {deleted_count} 个键")
             
             return True
@@ -270,91 +1026,194 @@ class RedisDataCache:
             logger.error(f"清理会话数据失败: {e}")
             return False
     
-    def get_session_keys(self, session_id: str) -> List[str]:
-        """获取会话的所有键"""
+    def get_session_keys(self, session_id: str, decode: bool = False) -> List[Union[bytes, str]]:
+        """
+        获取会话的所有键
+        
+        使用SCAN增量遍历，不会阻塞Redis；遍历期间新增的键可能不会被返回
+        
+        Args:
+            session_id: 会话ID
+            decode: 是否解码为str；默认返回bytes，可直接用于后续Redis命令
+        """
         try:
             if self._is_redis_available():
                 pattern = f"session:{session_id}:*"
-                keys = self.redis_client.keys(pattern)
-                return [key.decode('utf-8') if isinstance(key, bytes) else key for key in keys]
+                # SCAN可能重复返回同一个键，按出现顺序去重
+                keys = list(dict.fromkeys(self.redis_client.scan_iter(match=pattern, count=500)))
             else:
-                pattern_prefix = f"session:{session_id}:"
-                return [key for key in self._memory_cache.keys() if key.startswith(pattern_prefix)]
+                pattern_prefix = self._get_key(session_id, "")
+                with self._memory_lock:
+                    keys = [key for key in self._memory_cache.keys() if key.startswith(pattern_prefix)]
+            return [key.decode('utf-8') for key in keys] if decode else keys
         except Exception as e:
             logger.error(f"获取会话键失败: {e}")
             return []
     
     def get_all_active_sessions(self) -> List[str]:
-        """获取所有活跃会话ID"""
+        """
+        获取所有活跃会话ID
+        
+        Redis下读取活跃会话索引集合；已过期会话在 cleanup_expired_sessions 对账前可能仍在其中
+        """
         try:
             if self._is_redis_available():
-                keys = self.redis_client.keys("session:*:info")
-                session_ids = []
-                for key in keys:
-                    key_str = key.decode('utf-8') if isinstance(key, bytes) else key
-                    # 从 "session:session_id:info" 中提取 session_id
-                    parts = key_str.split(':')
-                    if len(parts) >= 3:
-                        session_ids.append(parts[1])
-                return list(set(session_ids))  # 去重
+                return [session_id.decode('utf-8') for session_id in self.redis_client.smembers(_ACTIVE_SET)]
             else:
                 session_ids = set()
-                for key in self._memory_cache.keys():
-                    if ':info' in key:
-                        parts = key.split(':')
-                        if len(parts) >= 3:
-                            session_ids.add(parts[1])
+                with self._memory_lock:
+                    keys = list(self._memory_cache.keys())
+                for key in keys:
+                    if key.endswith(b':info'):
+                        session_ids.add(_session_id_from_key(key).decode('utf-8'))
                 return list(session_ids)
         except Exception as e:
             logger.error(f"获取活跃会话失败: {e}")
             return []
     
+    def count_active_sessions(self) -> int:
+        """活跃会话数 (Redis下用SCARD，只返回数量不传输会话ID)"""
+        try:
+            if self._is_redis_available():
+                return self.redis_client.scard(_ACTIVE_SET)
+            return len(self.get_all_active_sessions())
+        except Exception as e:
+            logger.error(f"统计活跃会话失败: {e}")
+            return 0
+    
+    # ==================== 跨进程共享结果 ====================
+    
+    async def aget_shared(self, key: str) -> Optional[Any]:
+        """读取多个工作进程共享的计算结果 (内存缓存模式下没有其它进程，直接返回None)"""
+        if not self._is_redis_available():
+            return None
+        try:
+            blob = await self._aredis.get(key)
+            return _decode_payload(blob) if blob is not None else None
+        except Exception as e:
+            logger.error(f"读取共享结果失败: {e}")
+            return None
+    
+    async def astore_shared(self, key: str, data: Any, ttl: Optional[int] = None) -> bool:
+        """写入共享计算结果，供其它工作进程直接复用"""
+        if not self._is_redis_available():
+            return False
+        try:
+            await self._aredis.setex(key, ttl or self.default_ttl, _encode_payload(data, META_CODEC))
+            return True
+        except Exception as e:
+            logger.error(f"写入共享结果失败: {e}")
+            return False
+    
+    # ==================== 消息发布订阅 ====================
+    
+    async def apublish(self, channel: str, payload: Union[str, bytes]) -> int:
+        """发布消息到频道，返回收到消息的订阅者数 (内存缓存模式下没有其它进程，直接返回0)"""
+        if not self._is_redis_available():
+            return 0
+        try:
+            return await self._aredis.publish(channel, payload)
+        except Exception as e:
+            logger.error(f"发布消息失败: {e}")
+            return 0
+    
+    def apubsub(self):
+        """创建异步订阅对象 (使用无读超时的独立连接)，内存缓存模式下返回None"""
+        return self._apubsub_redis.pubsub() if self._is_redis_available() else None
+    
     # ==================== 工具方法 ====================
     
     def get_memory_usage(self) -> Dict[str, Any]:
         """获取缓存使用情况"""
         try:
             if self._is_redis_available():
-                info = self.redis_client.info('memory')
-                return {
+                # 短时间内的重复轮询直接返回缓存结果
+                cached = self._memory_usage_cache
+                if cached and time.monotonic() - cached[0] < MEMORY_USAGE_CACHE_SECONDS:
+                    return cached[1]
+                
+                # 一次INFO同时包含memory和clients段，与DBSIZE在同一次往返中完成
+                pipe = self.redis_client.pipeline(transaction=False)
+                pipe.info()
+                pipe.dbsize()
+                info, total_keys = pipe.execute()
+                usage = {
                     'used_memory_human': info.get('used_memory_human', 'Unknown'),
                     'used_memory_peak_human': info.get('used_memory_peak_human', 'Unknown'),
-                    'connected_clients': self.redis_client.info('clients').get('connected_clients', 0),
-                    'total_keys': self.redis_client.dbsize()
+                    'connected_clients': info.get('connected_clients', 0),
+                    'total_keys': total_keys
                 }
+                self._memory_usage_cache = (time.monotonic(), usage)
+                return usage
             else:
                 import sys
-                total_size = sum(
-                    sys.getsizeof(entry['data']) 
-                    for entry in self._memory_cache.values()
-                )
+                with self._memory_lock:
+                    total_size = sum(
+                        sys.getsizeof(entry['data']) 
+                        for entry in self._memory_cache.values()
+                    )
+                    total_keys = len(self._memory_cache)
                 return {
                     'used_memory_human': f"{total_size / 1024 / 1024:.2f}MB",
-                    'total_keys': len(self._memory_cache),
+                    'total_keys': total_keys,
                     'cache_type': 'memory'
                 }
         except Exception as e:
             logger.error(f"获取内存使用情况失败: {e}")
             return {}
     
+    def _rebuild_active_sessions_index(self) -> int:
+        """通过SCAN重建活跃会话索引 (用于索引缺失时的初始化)"""
+        session_ids = set()
+        for key in self.redis_client.scan_iter(match="session:*:info", count=1000):
+            session_ids.add(_session_id_from_key(key))
+        if session_ids:
+            self.redis_client.sadd(_ACTIVE_SET, *session_ids)
+        logger.info(f"重建活跃会话索引: {len(session_ids)} 个会话")
+        return len(session_ids)
+    
+    def _reconcile_active_sessions(self) -> int:
+        """对账活跃会话索引，移除info键已过期的会话"""
+        session_ids = list(self.redis_client.smembers(_ACTIVE_SET))
+        if not session_ids:
+            return 0
+        
+        pipe = self.redis_client.pipeline(transaction=False)
+        for session_id in session_ids:
+            pipe.exists(self._get_key(session_id.decode('utf-8'), "info"))
+        expired = [sid for sid, exists in zip(session_ids, pipe.execute()) if not exists]
+        
+        if expired:
+            self.redis_client.srem(_ACTIVE_SET, *expired)
+        return len(expired)
+    
     def cleanup_expired_sessions(self) -> int:
-        """清理过期会话 (仅内存缓存需要)"""
+        """清理过期会话 (Redis数据自动过期，只需对账活跃会话索引)"""
         if self._is_redis_available():
-            return 0  # Redis自动过期
+            try:
+                removed = self._reconcile_active_sessions()
+                logger.info(f"活跃会话索引移除了 {removed} 个过期会话")
+                return removed
+            except Exception as e:
+                logger.error(f"对账活跃会话索引失败: {e}")
+                return 0
         
         try:
-            current_time = datetime.now()
-            expired_keys = []
-            
-            for key, entry in self._memory_cache.items():
-                if entry['expires_at'] <= current_time:
-                    expired_keys.append(key)
+            current_time = time.time()
+            expired_count = 0
             
-            for key in expired_keys:
-                del self._memory_cache[key]
+            # 只弹出已到期的堆顶元素；条目被覆盖写入/淘汰后堆中残留的旧记录按过期时间比对后跳过
+            with self._memory_lock:
+                heap = self._expiry_heap
+                while heap and heap[0][0] <= current_time:
+                    expires_at, key = heapq.heappop(heap)
+                    entry = self._memory_cache.get(key)
+                    if entry is not None and entry['expires_at'] == expires_at:
+                        del self._memory_cache[key]
+                        expired_count += 1
             
-            logger.info(f"清理了 {len(expired_keys)} 个过期缓存项")
-            return len(expired_keys)
+            logger.info(f"清理了 {expired_count} 个过期缓存项")
+            return expired_count
             
         except Exception as e:
             logger.error(f"清理过期会话失败: {e}")
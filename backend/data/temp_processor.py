@@ -4,16 +4,24 @@
 
 import pandas as pd
 import numpy as np
-import io
+import codecs
+import tempfile
 import json
-from typing import Dict, List, Optional, Any, Tuple, Union
+from typing import Dict, List, Optional, Any, Tuple, Union, BinaryIO
 import logging
 from datetime import datetime
+from dataclasses import dataclass
 import asyncio
+from concurrent.futures import ThreadPoolExecutor
 from fastapi import UploadFile
+import aiofiles
 import chardet
 import sys
 import os
+import pyarrow as pa
+import pyarrow.csv as pacsv
+import pyarrow.compute as pc
+import pyarrow.json as pajson
 
 # 可选导入magic库
 try:
@@ -22,6 +30,38 @@ try:
 except ImportError:
     HAS_MAGIC = False
 
+# 可选导入orjson库
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+
+# 可选导入python-calamine库 (Rust实现的Excel解析，pandas>=2.2)
+try:
+    import python_calamine
+    HAS_CALAMINE = True
+except ImportError:
+    HAS_CALAMINE = False
+
+# 可选导入numexpr库
+try:
+    import numexpr as ne
+    HAS_NUMEXPR = True
+except ImportError:
+    HAS_NUMEXPR = False
+
+# 可选导入numba库
+try:
+    from numba import njit, prange, config as numba_config
+    # 核函数会在线程池中并发调用，需要线程安全的线程层；优先OpenMP
+    # (TBB线程层在工作线程中使用后，进程退出时可能挂起)
+    numba_config.THREADING_LAYER_PRIORITY = ['omp', 'tbb', 'workqueue']
+    numba_config.THREADING_LAYER = 'threadsafe'
+    HAS_NUMBA = True
+except ImportError:
+    HAS_NUMBA = False
+
 # 添加项目根目录到Python路径
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
@@ -29,11 +69,107 @@ from cache.redis_client import get_redis_cache
 
 logger = logging.getLogger(__name__)
 
+# 写时复制: 处理步骤共享原始数据，只有被修改的列才会复制 (pandas 3起默认开启)
+if int(pd.__version__.split('.')[0]) < 3:
+    pd.set_option("mode.copy_on_write", True)
+
+# 与pandas读取时一致的缺失值标记
+NA_VALUES = ['', 'NULL', 'null', 'NaN', 'nan']
+
+# PyArrow解析CSV时使用的缺失值标记: pandas默认标记 (keep_default_na=True) 加上NA_VALUES
+ARROW_NULL_VALUES = sorted(set(NA_VALUES) | {
+    '#N/A', '#N/A N/A', '#NA', '-1.#IND', '-1.#QNAN', '-NaN', '-nan', '1.#IND', '1.#QNAN',
+    '<NA>', 'N/A', 'NA', 'None', 'n/a'
+})
+
+# 上传文件分块读取大小
+UPLOAD_CHUNK_SIZE = 1 << 20
+
+# 编码检测使用的文件头/尾样本大小
+ENCODING_SAMPLE_SIZE = 64 << 10
+
+# 字节序标记 -> 编码 (UTF-32需在UTF-16之前判断，二者前缀相同)
+_BOM_ENCODINGS = [
+    (b'\xef\xbb\xbf', 'utf-8'),
+    (b'\xff\xfe\x00\x00', 'utf-32'),
+    (b'\x00\x00\xfe\xff', 'utf-32'),
+    (b'\xff\xfe', 'utf-16'),
+    (b'\xfe\xff', 'utf-16'),
+]
+
+if HAS_NUMBA:
+    @njit(parallel=True, cache=True)
+    def _iqr_mask_numba(arr, lower_bound, upper_bound):
+        """逐行判断是否所有列都在区间内，遇到越界列提前结束 (NaN视为越界)"""
+        n_rows, n_cols = arr.shape
+        mask = np.ones(n_rows, dtype=np.bool_)
+        for i in prange(n_rows):
+            for j in range(n_cols):
+                v = arr[i, j]
+                if not (v >= lower_bound[j] and v <= upper_bound[j]):
+                    mask[i] = False
+                    break
+        return mask
+
+def _iqr_mask(arr: np.ndarray, lower_bound: np.ndarray, upper_bound: np.ndarray) -> np.ndarray:
+    """逐行判断是否所有列都在区间内 (NaN视为越界)"""
+    if HAS_NUMBA:
+        try:
+            return _iqr_mask_numba(arr, lower_bound, upper_bound)
+        except ValueError as e:
+            # 没有可用的线程安全线程层
+            logger.debug(f"numba核函数不可用，使用NumPy计算: {e}")
+    with np.errstate(invalid='ignore'):
+        return ((arr >= lower_bound) & (arr <= upper_bound)).all(axis=1)
+
+def _shift_scale(arr: np.ndarray, shift: np.ndarray, scale: np.ndarray) -> None:
+    """原地计算 (arr - shift) / scale，有numexpr时减法和除法融合为一次分块遍历"""
+    if HAS_NUMEXPR:
+        ne.evaluate('(arr - shift) / scale', out=arr, casting='same_kind')
+    else:
+        arr -= shift
+        arr /= scale
+
+# 可能改变列类型的处理步骤，执行后需要重新分组列
+_DTYPE_CHANGING_STEPS = {'fill_na', 'encode_categorical'}
+
+# 可在Arrow表上连续执行的清洗步骤
+_ARROW_CLEANING_STEPS = {'drop_duplicates', 'drop_na', 'fill_na'}
+
+# Arrow去重时临时添加的行号列
+_ROW_NUMBER_COLUMN = '__row_number__'
+
+@dataclass
+class ColumnTypes:
+    """按数据类型分组的列名"""
+    numeric: List[Any]
+    categorical: List[Any]
+    datetime: List[Any]
+    
+    @classmethod
+    def from_df(cls, df: pd.DataFrame) -> "ColumnTypes":
+        return cls(
+            numeric=df.select_dtypes(include=[np.number]).columns.tolist(),
+            categorical=df.select_dtypes(include=['object']).columns.tolist(),
+            datetime=df.select_dtypes(include=['datetime64']).columns.tolist()
+        )
+
 class TempDataProcessor:
     """临时数据处理器"""
     
     def __init__(self):
         self.redis_cache = get_redis_cache()
+        # 按列独立的计算 (pandas/NumPy内核执行时释放GIL) 在线程池中并行
+        self._column_pool = ThreadPoolExecutor(
+            max_workers=os.cpu_count() or 1,
+            thread_name_prefix="column-worker"
+        )
+        # 文件解析和处理步骤是CPU密集操作，放到独立线程池执行，避免阻塞事件循环
+        # (与列线程池分开，任务内部再提交列计算时不会互相占满导致死锁)
+        self._task_pool = ThreadPoolExecutor(
+            max_workers=min(4, os.cpu_count() or 1),
+            thread_name_prefix="data-task"
+        )
         self.supported_formats = {
             '.csv': self._read_csv,
             '.xlsx': self._read_excel,
@@ -60,49 +196,86 @@ class TempDataProcessor:
         Returns:
             处理结果字典
         """
+        logger.info(f"开始处理文件: {file.filename}, 会话: {session_id}")
+        
+        file_format = self._detect_file_format(file.filename)
+        fd, tmp_path = tempfile.mkstemp(prefix="upload-", suffix=file_format)
+        os.close(fd)
         try:
-            logger.info(f"开始处理文件: {file.filename}, 会话: {session_id}")
+            # 分块异步写入临时文件，上传内容不在内存中整体缓冲，写盘也不阻塞事件循环
+            async with aiofiles.open(tmp_path, 'wb') as f:
+                while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+                    await f.write(chunk)
             
-            # 读取文件内容
-            file_content = await file.read()
-            file_size = len(file_content)
+            return await self.process_from_path(session_id, tmp_path, file.filename, processing_options)
             
-            # 检测文件格式
-            file_format = self._detect_file_format(file.filename)
-            
-            # 检测编码
-            encoding = self._detect_encoding(file_content)
+        except Exception as e:
+            logger.error(f"文件处理失败: {e}")
+            return {
+                'success': False,
+                'error': str(e),
+                'message': f'处理文件 {file.filename} 时出错'
+            }
+        finally:
+            try:
+                os.unlink(tmp_path)
+            except OSError:
+                pass
+    
+    async def process_from_path(self, 
+                                session_id: str, 
+                                file_path: str,
+                                filename: Optional[str] = None,
+                                processing_options: Optional[Dict] = None) -> Dict[str, Any]:
+        """
+        解析磁盘上的数据文件并存入会话
+        
+        Args:
+            session_id: 会话ID
+            file_path: 文件路径
+            filename: 原始文件名 (用于判断格式，默认取路径中的文件名)
+            processing_options: 处理选项
             
-            # 读取数据
-            df = await self._read_file_content(file_content, file_format, encoding, processing_options)
+        Returns:
+            处理结果字典
+        """
+        filename = filename or os.path.basename(file_path)
+        try:
+            file_size = os.path.getsize(file_path)
             
-            # 生成数据元信息
-            metadata = self._generate_metadata(df, file.filename, file_size, file_format, encoding)
+            # 检测文件格式
+            file_format = self._detect_file_format(filename)
             
-            # 存储原始数据到Redis
-            success = self.redis_cache.store_dataframe(session_id, "raw_data", df)
-            if not success:
-                raise Exception("存储原始数据失败")
+            # 编码检测和解析都在线程池中直接读取文件
+            df, encoding = await self._read_file_content(file_path, file_format, processing_options)
             
-            # 存储元信息
-            self.redis_cache.store_data_metadata(session_id, metadata)
+            # 生成数据元信息
+            column_types = ColumnTypes.from_df(df)
+            metadata = self._generate_metadata(df, filename, file_size, file_format, encoding, column_types)
             
-            # 更新会话信息
-            self._update_session_info(session_id, {
+            # 原始数据、元信息和更新后的会话信息在一次往返中写入Redis
+            session_info = self._merged_session_info(session_id, {
                 'has_data': True,
                 'data_uploaded_at': datetime.now().isoformat(),
-                'file_name': file.filename,
+                'file_name': filename,
                 'file_size': file_size,
                 'data_shape': df.shape
             })
+            success = self.redis_cache.store_many(session_id, {
+                "raw_data": df,
+                "metadata": metadata,
+                "info": session_info
+            })
+            if not success:
+                raise Exception("存储原始数据失败")
             
-            logger.info(f"文件处理完成: {file.filename}, 形状: {df.shape}")
+            logger.info(f"文件处理完成: {filename}, 形状: {df.shape}")
             
             return {
                 'success': True,
                 'metadata': metadata,
-                'preview': self._generate_preview(df),
-                'message': f'成功处理文件 {file.filename}'
+                'preview': self._generate_preview(df, column_types=column_types),
+                'message': f'成功处理文件 {filename}'
             }
             
         except Exception as e:
@@ -110,7 +283,7 @@ class TempDataProcessor:
             return {
                 'success': False,
                 'error': str(e),
-                'message': f'处理文件 {file.filename} 时出错'
+                'message': f'处理文件 {filename} 时出错'
             }
     
     def _detect_file_format(self, filename: str) -> str:
@@ -121,37 +294,98 @@ class TempDataProcessor:
                     return ext
         return '.csv'
     
-    def _detect_encoding(self, content: bytes) -> str:
-        """检测文件编码"""
+    def _detect_encoding(self, source: BinaryIO) -> str:
+        """检测文件编码 (只检查文件头尾样本，耗时与文件大小无关)"""
         try:
-            result = chardet.detect(content)
+            source.seek(0)
+            head = source.read(ENCODING_SAMPLE_SIZE)
+            
+            for bom, encoding in _BOM_ENCODINGS:
+                if head.startswith(bom):
+                    return encoding
+            
+            try:
+                head.decode('utf-8')
+                return 'utf-8'
+            except UnicodeDecodeError as e:
+                # 样本在多字节字符中间截断
+                if e.reason == 'unexpected end of data':
+                    return 'utf-8'
+            
+            sample = head
+            file_size = source.seek(0, os.SEEK_END)
+            if file_size > 2 * ENCODING_SAMPLE_SIZE:
+                source.seek(-ENCODING_SAMPLE_SIZE, os.SEEK_END)
+                sample += source.read(ENCODING_SAMPLE_SIZE)
+            
+            result = chardet.detect(sample)
             return result['encoding'] if result['confidence'] > 0.7 else 'utf-8'
         except:
             return 'utf-8'
     
     async def _read_file_content(self, 
-                                content: bytes, 
+                                file_path: str, 
                                 file_format: str, 
-                                encoding: str,
-                                options: Optional[Dict] = None) -> pd.DataFrame:
-        """读取文件内容为DataFrame"""
+                                options: Optional[Dict] = None) -> Tuple[pd.DataFrame, str]:
+        """读取文件内容为DataFrame (在线程池中检测编码并解析)，返回 (DataFrame, 编码)"""
         options = options or {}
         
         if file_format not in self.supported_formats:
             raise ValueError(f"不支持的文件格式: {file_format}")
         
-        # 使用对应的读取方法
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self._task_pool, self._read_file_sync, file_path, file_format, options
+        )
+    
+    def _read_file_sync(self, 
+                        file_path: str, 
+                        file_format: str, 
+                        options: Dict) -> Tuple[pd.DataFrame, str]:
+        """使用对应的读取方法解析文件，并按需压缩数值类型"""
         reader_func = self.supported_formats[file_format]
-        return reader_func(content, encoding, options)
+        # 内存映射: PyArrow解析器直接读取页缓存，不经过Python文件对象 (读取时不持有GIL)
+        with pa.memory_map(file_path) as source:
+            encoding = self._detect_encoding(source)
+            source.seek(0)
+            df = reader_func(source, encoding, options)
+        
+        if options.get('downcast', True):
+            df = self._downcast_numeric(df)
+        return df, encoding
     
-    def _read_csv(self, content: bytes, encoding: str, options: Dict) -> pd.DataFrame:
-        """读取CSV文件"""
+    def _downcast_numeric(self, df: pd.DataFrame) -> pd.DataFrame:
+        """int64/float64列在不损失信息时降为int32/float32 (float需往返转换后完全相等)"""
+        int32_info = np.iinfo(np.int32)
+        downcast = {}
+        for col, dtype in df.dtypes.items():
+            if dtype == np.int64:
+                values = df[col].to_numpy()
+                if len(values) and values.min() >= int32_info.min and values.max() <= int32_info.max:
+                    downcast[col] = np.int32
+            elif dtype == np.float64:
+                values = df[col].to_numpy()
+                with np.errstate(over='ignore'):
+                    roundtrip = values.astype(np.float32).astype(np.float64)
+                if np.array_equal(roundtrip, values, equal_nan=True):
+                    downcast[col] = np.float32
+        
+        return df.astype(downcast) if downcast else df
+    
+    def _read_csv(self, source: BinaryIO, encoding: str, options: Dict) -> pd.DataFrame:
+        """读取CSV文件 (优先使用PyArrow多线程解析，失败时回退到pandas)"""
+        try:
+            return self._read_csv_arrow(source, encoding, options)
+        except Exception as e:
+            logger.debug(f"PyArrow解析CSV失败，回退到pandas: {e}")
+            source.seek(0)
+        
         try:
             # 默认参数
             read_params = {
                 'sep': options.get('separator', ','),
                 'encoding': encoding,
-                'na_values': ['', 'NULL', 'null', 'NaN', 'nan'],
+                'na_values': NA_VALUES,
                 'keep_default_na': True,
                 'low_memory': False
             }
@@ -164,7 +398,7 @@ class TempDataProcessor:
                 read_params['skiprows'] = options['skip_rows']
             
             # 读取数据
-            df = pd.read_csv(io.BytesIO(content), **read_params)
+            df = pd.read_csv(source, **read_params)
             
             return df
             
@@ -172,61 +406,128 @@ class TempDataProcessor:
             logger.error(f"读取CSV文件失败: {e}")
             raise
     
-    def _read_excel(self, content: bytes, encoding: str, options: Dict) -> pd.DataFrame:
+    def _read_csv_arrow(self, source: BinaryIO, encoding: str, options: Dict) -> pd.DataFrame:
+        """使用PyArrow读取CSV，按块流式读取并行解析"""
+        has_header = options.get('has_header', True)
+        skip_rows = options.get('skip_rows', 0)
+        if not isinstance(skip_rows, int):
+            # pandas支持的行号列表/函数形式PyArrow无法表达
+            raise ValueError("skip_rows仅支持整数")
+        
+        read_options = pacsv.ReadOptions(
+            use_threads=True,
+            block_size=8 << 20,
+            skip_rows=skip_rows,
+            autogenerate_column_names=not has_header,
+            encoding=encoding or 'utf8'
+        )
+        parse_options = pacsv.ParseOptions(delimiter=options.get('separator', ','))
+        convert_options = pacsv.ConvertOptions(null_values=ARROW_NULL_VALUES, strings_can_be_null=True)
+        
+        table = pacsv.read_csv(
+            source,
+            read_options=read_options,
+            parse_options=parse_options,
+            convert_options=convert_options
+        )
+        if len(set(table.column_names)) != table.num_columns:
+            # PyArrow保留重复列名，交给pandas按 a, a.1 的规则重命名
+            raise ValueError("CSV包含重复列名")
+        df = table.to_pandas(self_destruct=True)
+        if not has_header:
+            # 与pandas header=None一致，使用整数列名
+            df.columns = range(df.shape[1])
+        return df
+    
+    def _read_excel(self, source: BinaryIO, encoding: str, options: Dict) -> pd.DataFrame:
         """读取Excel文件"""
         try:
             read_params = {
                 'sheet_name': options.get('sheet_name', 0),
-                'na_values': ['', 'NULL', 'null', 'NaN', 'nan']
+                'na_values': NA_VALUES
             }
             
             if 'has_header' in options:
                 read_params['header'] = 0 if options['has_header'] else None
             
-            df = pd.read_excel(io.BytesIO(content), **read_params)
+            if HAS_CALAMINE:
+                try:
+                    return pd.read_excel(source, engine='calamine', **read_params)
+                except Exception as e:
+                    logger.debug(f"calamine解析Excel失败，回退到默认引擎: {e}")
+                    source.seek(0)
+            
+            df = pd.read_excel(source, **read_params)
             return df
             
         except Exception as e:
             logger.error(f"读取Excel文件失败: {e}")
             raise
     
-    def _read_json(self, content: bytes, encoding: str, options: Dict) -> pd.DataFrame:
+    def _read_json(self, source: BinaryIO, encoding: str, options: Dict) -> pd.DataFrame:
         """读取JSON文件"""
         try:
-            json_str = content.decode(encoding)
+            is_utf8 = codecs.lookup(encoding).name in ('utf-8', 'ascii')
             
-            # 尝试不同的JSON格式
+            if is_utf8:
+                # 行分隔的JSON: PyArrow直接在字节上多线程解析
+                # (只有一行时可能是单个嵌套对象，交给下面规范化处理)
+                try:
+                    table = pajson.read_json(source)
+                    if table.num_rows > 1:
+                        return table.to_pandas(self_destruct=True)
+                except pa.ArrowException:
+                    pass
+                source.seek(0)
+            
+            content = source.read()
             try:
+                # orjson直接解析UTF-8字节，无需先解码为str
+                data = None
+                if is_utf8 and HAS_ORJSON:
+                    try:
+                        data = orjson.loads(content)
+                    except orjson.JSONDecodeError:
+                        # orjson不接受NaN/Infinity等非标准字面量，交给json模块
+                        pass
+                if data is None:
+                    data = json.loads(content.decode(encoding))
+            except ValueError:
+                # 行分隔但各行结构不一致的JSON (pandas直接从文件句柄按块解码，不再复制整个内容)
+                del content
+                source.seek(0)
+                return pd.read_json(source, lines=True, encoding=encoding)
+            
+            if isinstance(data, list):
                 # 标准JSON数组
-                df = pd.read_json(json_str, orient='records')
-            except:
-                try:
-                    # 行分隔的JSON
-                    df = pd.read_json(json_str, lines=True)
-                except:
-                    # 嵌套JSON，尝试规范化
-                    data = json.loads(json_str)
-                    df = pd.json_normalize(data)
+                if data and all(isinstance(record, dict) for record in data):
+                    try:
+                        # 从全部记录推断结构类型 (from_pylist只按第一条记录的键取列)
+                        return pa.Table.from_struct_array(pa.array(data)).to_pandas(self_destruct=True)
+                    except (pa.ArrowInvalid, pa.ArrowTypeError):
+                        pass
+                return pd.DataFrame(data)
             
-            return df
+            # 嵌套JSON，尝试规范化
+            return pd.json_normalize(data)
             
         except Exception as e:
             logger.error(f"读取JSON文件失败: {e}")
             raise
     
-    def _read_parquet(self, content: bytes, encoding: str, options: Dict) -> pd.DataFrame:
+    def _read_parquet(self, source: BinaryIO, encoding: str, options: Dict) -> pd.DataFrame:
         """读取Parquet文件"""
         try:
-            df = pd.read_parquet(io.BytesIO(content))
+            df = pd.read_parquet(source)
             return df
         except Exception as e:
             logger.error(f"读取Parquet文件失败: {e}")
             raise
     
-    def _read_tsv(self, content: bytes, encoding: str, options: Dict) -> pd.DataFrame:
+    def _read_tsv(self, source: BinaryIO, encoding: str, options: Dict) -> pd.DataFrame:
         """读取TSV文件"""
         options['separator'] = '\t'
-        return self._read_csv(content, encoding, options)
+        return self._read_csv(source, encoding, options)
     
     # ==================== 数据处理方法 ====================
     
@@ -246,31 +547,38 @@ class TempDataProcessor:
             logger.info(f"开始数据处理: 会话 {session_id}")
             
             # 获取原始数据
-            df = self.redis_cache.get_dataframe(session_id, "raw_data")
+            df = await self.redis_cache.aget_dataframe(session_id, "raw_data")
             if df is None:
                 raise ValueError("未找到原始数据")
             
-            processed_df = df.copy()
-            total_steps = len(processing_config.get('steps', []))
+            processed_df = df
+            # 列类型分组在各步骤间复用，只在步骤可能改变列类型时重新计算
+            column_types = ColumnTypes.from_df(processed_df)
+            steps = processing_config.get('steps', [])
+            total_steps = len(steps)
             
-            # 执行处理步骤
-            for i, step in enumerate(processing_config.get('steps', [])):
+            # 执行处理步骤 (连续的清洗步骤合并为一批)
+            for batch in self._batch_processing_steps(steps):
                 if progress_callback:
-                    await progress_callback({
-                        'stage': 'processing',
-                        'step': i + 1,
-                        'total_steps': total_steps,
-                        'progress': (i + 1) / total_steps,
-                        'current_operation': step.get('name', '未知操作')
-                    })
-                
-                processed_df = await self._apply_processing_step(processed_df, step)
+                    for i, step in batch:
+                        await progress_callback({
+                            'stage': 'processing',
+                            'step': i + 1,
+                            'total_steps': total_steps,
+                            'progress': (i + 1) / total_steps,
+                            'current_operation': step.get('name', '未知操作')
+                        })
                 
-                # 模拟处理时间
-                await asyncio.sleep(0.1)
+                batch_steps = [step for _, step in batch]
+                if len(batch_steps) > 1:
+                    processed_df = await self._apply_cleaning_steps(processed_df, batch_steps, column_types)
+                else:
+                    processed_df = await self._apply_processing_step(processed_df, batch_steps[0], column_types)
+                if any(step.get('type') in _DTYPE_CHANGING_STEPS for step in batch_steps):
+                    column_types = ColumnTypes.from_df(processed_df)
             
             # 存储处理后的数据
-            success = self.redis_cache.store_dataframe(session_id, "processed_data", processed_df)
+            success = await self.redis_cache.astore_dataframe(session_id, "processed_data", processed_df)
             if not success:
                 raise Exception("存储处理后数据失败")
             
@@ -289,7 +597,7 @@ class TempDataProcessor:
             return {
                 'success': True,
                 'report': report,
-                'preview': self._generate_preview(processed_df),
+                'preview': self._generate_preview(processed_df, column_types=column_types),
                 'shape': processed_df.shape,
                 'message': '数据处理完成'
             }
@@ -302,10 +610,86 @@ class TempDataProcessor:
                 'message': '数据处理失败'
             }
     
-    async def _apply_processing_step(self, df: pd.DataFrame, step: Dict) -> pd.DataFrame:
-        """应用单个处理步骤"""
+    def _batch_processing_steps(self, steps: List[Dict]) -> List[List[Tuple[int, Dict]]]:
+        """将处理步骤分批: 连续的去重/删除缺失/填充缺失步骤为一批，其余每个步骤单独一批"""
+        batches = []
+        for i, step in enumerate(steps):
+            if (batches and step.get('type') in _ARROW_CLEANING_STEPS
+                    and batches[-1][-1][1].get('type') in _ARROW_CLEANING_STEPS):
+                batches[-1].append((i, step))
+            else:
+                batches.append([(i, step)])
+        return batches
+    
+    async def _apply_cleaning_steps(self, 
+                                    df: pd.DataFrame, 
+                                    steps: List[Dict],
+                                    column_types: Optional[ColumnTypes] = None) -> pd.DataFrame:
+        """连续执行多个清洗步骤 (在线程池中执行)"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._task_pool, self._clean_sync, df, steps, column_types)
+    
+    def _clean_sync(self, 
+                    df: pd.DataFrame, 
+                    steps: List[Dict],
+                    column_types: Optional[ColumnTypes] = None) -> pd.DataFrame:
+        """
+        在Arrow表上连续执行清洗步骤，只在首尾各转换一次
+        
+        Arrow无法表达的情况 (混合类型列、填充值与列类型不兼容等) 逐步回退到pandas
+        """
+        try:
+            # 保留索引为普通列，删除行后索引标签与pandas处理结果一致
+            table = pa.Table.from_pandas(df, preserve_index=True)
+            index_columns = set(table.schema.pandas_metadata['index_columns'])
+            data_columns = [name for name in table.column_names if name not in index_columns]
+            
+            for step in steps:
+                step_type = step.get('type')
+                if step_type == 'drop_duplicates':
+                    table = self._arrow_drop_duplicates(table, data_columns)
+                elif step_type == 'drop_na':
+                    table = table.drop_null()
+                else:
+                    fill_value = step.get('params', {}).get('value', 0)
+                    for name in data_columns:
+                        column = table.column(name)
+                        if column.null_count:
+                            table = table.set_column(
+                                table.schema.get_field_index(name), name, pc.fill_null(column, fill_value)
+                            )
+            
+            return table.to_pandas(self_destruct=True)
+            
+        except (pa.ArrowException, TypeError, ValueError, KeyError) as e:
+            logger.debug(f"Arrow清洗失败，回退到pandas: {e}")
+            for step in steps:
+                df = self._apply_step_sync(df, step, column_types)
+            return df
+    
+    def _arrow_drop_duplicates(self, table: pa.Table, data_columns: List[str]) -> pa.Table:
+        """按数据列去重，保留每组首次出现的行并维持原有顺序 (与DataFrame.drop_duplicates一致)"""
+        numbered = table.append_column(_ROW_NUMBER_COLUMN, pa.array(np.arange(table.num_rows)))
+        first_rows = numbered.group_by(data_columns).aggregate([(_ROW_NUMBER_COLUMN, 'min')])
+        rows = np.sort(first_rows.column(f'{_ROW_NUMBER_COLUMN}_min').to_numpy())
+        return table.take(rows)
+    
+    async def _apply_processing_step(self, 
+                                     df: pd.DataFrame, 
+                                     step: Dict,
+                                     column_types: Optional[ColumnTypes] = None) -> pd.DataFrame:
+        """应用单个处理步骤 (在线程池中执行)"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._task_pool, self._apply_step_sync, df, step, column_types)
+    
+    def _apply_step_sync(self, 
+                         df: pd.DataFrame, 
+                         step: Dict,
+                         column_types: Optional[ColumnTypes] = None) -> pd.DataFrame:
+        """按步骤类型分发处理"""
         step_type = step.get('type')
         params = step.get('params', {})
+        column_types = column_types or ColumnTypes.from_df(df)
         
         if step_type == 'drop_duplicates':
             return df.drop_duplicates()
@@ -318,60 +702,86 @@ class TempDataProcessor:
             return df.fillna(fill_value)
         
         elif step_type == 'remove_outliers':
-            return self._remove_outliers(df, params)
+            return self._remove_outliers(df, params, column_types)
         
         elif step_type == 'normalize':
-            return self._normalize_data(df, params)
+            return self._normalize_data(df, params, column_types)
         
         elif step_type == 'encode_categorical':
-            return self._encode_categorical(df, params)
+            return self._encode_categorical(df, params, column_types)
         
         else:
             logger.warning(f"未知的处理步骤类型: {step_type}")
             return df
     
-    def _remove_outliers(self, df: pd.DataFrame, params: Dict) -> pd.DataFrame:
+    def _remove_outliers(self, 
+                         df: pd.DataFrame, 
+                         params: Dict,
+                         column_types: Optional[ColumnTypes] = None) -> pd.DataFrame:
         """移除异常值"""
         method = params.get('method', 'iqr')
-        numeric_columns = df.select_dtypes(include=[np.number]).columns
+        numeric_columns = (column_types or ColumnTypes.from_df(df)).numeric
         
-        if method == 'iqr':
-            for col in numeric_columns:
-                Q1 = df[col].quantile(0.25)
-                Q3 = df[col].quantile(0.75)
-                IQR = Q3 - Q1
-                lower_bound = Q1 - 1.5 * IQR
-                upper_bound = Q3 + 1.5 * IQR
-                df = df[(df[col] >= lower_bound) & (df[col] <= upper_bound)]
+        if method == 'iqr' and len(numeric_columns) > 0:
+            # 一次计算所有列的分位数，再用单个布尔掩码过滤，避免逐列生成中间DataFrame
+            numeric = df[numeric_columns]
+            Q1, Q3 = numeric.quantile([0.25, 0.75]).to_numpy(dtype=np.float64, na_value=np.nan)
+            IQR = Q3 - Q1
+            lower_bound = Q1 - 1.5 * IQR
+            upper_bound = Q3 + 1.5 * IQR
+            arr = numeric.to_numpy(dtype=np.float64, na_value=np.nan)
+            # 含NaN的行与逐列过滤时一样会被移除
+            df = df[_iqr_mask(arr, lower_bound, upper_bound)]
         
         return df
     
-    def _normalize_data(self, df: pd.DataFrame, params: Dict) -> pd.DataFrame:
+    def _normalize_data(self, 
+                        df: pd.DataFrame, 
+                        params: Dict,
+                        column_types: Optional[ColumnTypes] = None) -> pd.DataFrame:
         """数据标准化"""
         method = params.get('method', 'standard')
-        columns = params.get('columns', df.select_dtypes(include=[np.number]).columns)
+        columns = params.get('columns', (column_types or ColumnTypes.from_df(df)).numeric)
+        
+        if len(columns) == 0 or method not in ('standard', 'minmax'):
+            return df
         
-        if method == 'standard':
-            # Z-score标准化
-            df[columns] = (df[columns] - df[columns].mean()) / df[columns].std()
-        elif method == 'minmax':
-            # Min-Max归一化
-            df[columns] = (df[columns] - df[columns].min()) / (df[columns].max() - df[columns].min())
+        # 在float32副本上原地计算，避免pandas逐列分发和中间DataFrame
+        arr = df[columns].to_numpy(dtype=np.float32, na_value=np.nan, copy=True)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            if method == 'standard':
+                # Z-score标准化 (与pandas一致: 忽略缺失值，样本标准差)
+                shift = np.nanmean(arr, axis=0)
+                scale = np.nanstd(arr, axis=0, ddof=1)
+            else:
+                # Min-Max归一化
+                shift = np.nanmin(arr, axis=0)
+                scale = np.nanmax(arr, axis=0) - shift
+            _shift_scale(arr, shift, scale)
+        # 浅拷贝后整列替换，不修改调用方持有的DataFrame
+        df = df.copy(deep=False)
+        df[columns] = arr
         
         return df
     
-    def _encode_categorical(self, df: pd.DataFrame, params: Dict) -> pd.DataFrame:
+    def _encode_categorical(self, 
+                            df: pd.DataFrame, 
+                            params: Dict,
+                            column_types: Optional[ColumnTypes] = None) -> pd.DataFrame:
         """分类变量编码"""
         method = params.get('method', 'onehot')
-        columns = params.get('columns', df.select_dtypes(include=['object']).columns)
+        columns = params.get('columns', (column_types or ColumnTypes.from_df(df)).categorical)
         
         if method == 'onehot':
-            df = pd.get_dummies(df, columns=columns, prefix=columns)
+            df = pd.get_dummies(df, columns=columns, prefix=columns, dtype=np.uint8)
         elif method == 'label':
-            from sklearn.preprocessing import LabelEncoder
-            le = LabelEncoder()
-            for col in columns:
-                df[col] = le.fit_transform(df[col].astype(str))
+            # 哈希表分类编码 (类别按值排序，缺失值编码为-1)
+            df = df.copy(deep=False)
+            codes = self._column_pool.map(
+                lambda col: pd.Categorical(df[col]).codes.astype(np.int32), columns
+            )
+            for col, col_codes in zip(columns, list(codes)):
+                df[col] = col_codes
         
         return df
     
@@ -389,10 +799,10 @@ class TempDataProcessor:
         """
         try:
             # 获取处理后的数据
-            df = self.redis_cache.get_dataframe(session_id, "processed_data")
+            df = await self.redis_cache.aget_dataframe(session_id, "processed_data")
             if df is None:
                 # 如果没有处理后的数据，使用原始数据
-                df = self.redis_cache.get_dataframe(session_id, "raw_data")
+                df = await self.redis_cache.aget_dataframe(session_id, "raw_data")
                 if df is None:
                     raise ValueError("未找到数据")
             
@@ -411,21 +821,25 @@ class TempDataProcessor:
                     stratify=df[stratify_column]
                 )
             else:
-                # 随机分割
-                train_df = df.sample(frac=1-test_size, random_state=random_state)
-                test_df = df.drop(train_df.index)
-            
-            # 存储分割后的数据
-            self.redis_cache.store_dataframe(session_id, "train_data", train_df)
-            self.redis_cache.store_dataframe(session_id, "test_data", test_df)
-            
-            # 更新会话信息
-            self._update_session_info(session_id, {
+                # 随机分割: 一次随机排列后按位置切分，避免按索引做集合差
+                n_rows = len(df)
+                order = np.random.default_rng(random_state).permutation(n_rows)
+                cut = int(round(n_rows * (1 - test_size)))
+                train_df = df.iloc[order[:cut]]
+                test_df = df.iloc[order[cut:]]
+            
+            # 分割后的数据和更新后的会话信息一次写入
+            session_info = self._merged_session_info(session_id, {
                 'data_split': True,
                 'split_at': datetime.now().isoformat(),
                 'train_shape': train_df.shape,
                 'test_shape': test_df.shape
             })
+            self.redis_cache.store_many(session_id, {
+                "train_data": train_df,
+                "test_data": test_df,
+                "info": session_info
+            })
             
             return {
                 'success': True,
@@ -451,11 +865,11 @@ class TempDataProcessor:
                           filename: str, 
                           file_size: int,
                           file_format: str,
-                          encoding: str) -> Dict[str, Any]:
+                          encoding: str,
+                          column_types: Optional[ColumnTypes] = None) -> Dict[str, Any]:
         """生成数据元信息"""
-        numeric_columns = df.select_dtypes(include=[np.number]).columns.tolist()
-        categorical_columns = df.select_dtypes(include=['object']).columns.tolist()
-        datetime_columns = df.select_dtypes(include=['datetime64']).columns.tolist()
+        column_types = column_types or ColumnTypes.from_df(df)
+        missing_values, memory_usage = self._missing_and_memory(df)
         
         return {
             'filename': filename,
@@ -465,24 +879,80 @@ class TempDataProcessor:
             'shape': df.shape,
             'columns': df.columns.tolist(),
             'dtypes': df.dtypes.astype(str).to_dict(),
-            'numeric_columns': numeric_columns,
-            'categorical_columns': categorical_columns,
-            'datetime_columns': datetime_columns,
-            'missing_values': df.isnull().sum().to_dict(),
-            'memory_usage': df.memory_usage(deep=True).sum(),
+            'numeric_columns': column_types.numeric,
+            'categorical_columns': column_types.categorical,
+            'datetime_columns': column_types.datetime,
+            'missing_values': missing_values,
+            'memory_usage': memory_usage,
             'created_at': datetime.now().isoformat()
         }
     
-    def _generate_preview(self, df: pd.DataFrame, n_rows: int = 10) -> Dict[str, Any]:
+    def _generate_preview(self, 
+                          df: pd.DataFrame, 
+                          n_rows: int = 10,
+                          column_types: Optional[ColumnTypes] = None) -> Dict[str, Any]:
         """生成数据预览"""
+        column_types = column_types or ColumnTypes.from_df(df)
         return {
-            'head': df.head(n_rows).to_dict('records'),
+            'head': self._head_records(df, n_rows),
             'columns': df.columns.tolist(),
             'dtypes': df.dtypes.astype(str).to_dict(),
             'shape': df.shape,
-            'describe': df.describe().to_dict() if len(df.select_dtypes(include=[np.number]).columns) > 0 else {}
+            'describe': self._describe_numeric(df, column_types.numeric) if column_types.numeric else {}
         }
     
+    def _head_records(self, df: pd.DataFrame, n_rows: int) -> List[Dict[str, Any]]:
+        """前n行转换为记录列表 (Arrow在C++中构造Python对象，缺失值转为None)"""
+        head = df.head(n_rows)
+        try:
+            return pa.Table.from_pandas(head, preserve_index=False).to_pylist()
+        except (pa.ArrowInvalid, pa.ArrowNotImplementedError, pa.ArrowTypeError):
+            return head.to_dict('records')
+    
+    def _describe_numeric(self, df: pd.DataFrame, numeric_columns: List[Any]) -> Dict[str, Dict[str, Any]]:
+        """数值列统计 (与DataFrame.describe格式一致)，使用Arrow计算内核逐列聚合"""
+        try:
+            table = pa.Table.from_pandas(df[numeric_columns], preserve_index=False)
+            stats = {}
+            for name, column in zip(numeric_columns, table.columns):
+                min_max = pc.min_max(column)
+                q1, median, q3 = pc.quantile(column, q=[0.25, 0.5, 0.75]).to_pylist() or [None] * 3
+                stats[name] = {
+                    'count': float(len(column) - column.null_count),
+                    'mean': pc.mean(column).as_py(),
+                    'std': pc.stddev(column, ddof=1).as_py(),
+                    'min': min_max['min'].as_py(),
+                    '25%': q1,
+                    '50%': median,
+                    '75%': q3,
+                    'max': min_max['max'].as_py()
+                }
+            return stats
+        except (pa.ArrowInvalid, pa.ArrowNotImplementedError, pa.ArrowTypeError) as e:
+            logger.debug(f"Arrow统计失败，回退到pandas: {e}")
+            return df[numeric_columns].describe().to_dict()
+    
+    def _missing_and_memory(self, df: pd.DataFrame) -> Tuple[Dict[Any, int], int]:
+        """
+        各列缺失值数量和内存占用估算
+        
+        转换为Arrow一次: 缺失值直接读取null_count；内存为浅层占用加字符串列的UTF-8字节数，
+        避免memory_usage(deep=True)逐个访问Python字符串对象
+        """
+        try:
+            table = pa.Table.from_pandas(df, preserve_index=False)
+        except (pa.ArrowInvalid, pa.ArrowNotImplementedError, pa.ArrowTypeError):
+            # 混合类型的object列无法转换为Arrow
+            return df.isnull().sum().to_dict(), int(df.memory_usage(deep=True).sum())
+        
+        missing_values = {}
+        memory_usage = int(df.memory_usage(deep=False).sum())
+        for (name, dtype), column in zip(df.dtypes.items(), table.columns):
+            missing_values[name] = column.null_count
+            if dtype == object and (pa.types.is_string(column.type) or pa.types.is_large_string(column.type)):
+                memory_usage += pc.sum(pc.utf8_length(column)).as_py() or 0
+        return missing_values, memory_usage
+    
     def _generate_processing_report(self, 
                                    original_df: pd.DataFrame, 
                                    processed_df: pd.DataFrame,
@@ -497,13 +967,17 @@ class TempDataProcessor:
             'processing_time': datetime.now().isoformat()
         }
     
+    def _merged_session_info(self, session_id: str, update_data: Dict) -> Dict:
+        """读取当前会话信息并合并更新内容"""
+        current_info = self.redis_cache.get_session_info(session_id) or {}
+        current_info.update(update_data)
+        current_info['last_updated'] = datetime.now().isoformat()
+        return current_info
+    
     def _update_session_info(self, session_id: str, update_data: Dict):
         """更新会话信息"""
         try:
-            current_info = self.redis_cache.get_session_info(session_id) or {}
-            current_info.update(update_data)
-            current_info['last_updated'] = datetime.now().isoformat()
-            self.redis_cache.store_session_info(session_id, current_info)
+            self.redis_cache.store_session_info(session_id, self._merged_session_info(session_id, update_data))
         except Exception as e:
             logger.error(f"更新会话信息失败: {e}")
     
@@ -515,13 +989,17 @@ class TempDataProcessor:
         session_info = self.redis_cache.get_session_info(session_id)
         
         if metadata:
+            # 只检查键是否存在，不读取整个DataFrame
+            exists = self.redis_cache.has_dataframes(
+                session_id, ["raw_data", "processed_data", "train_data", "test_data"]
+            )
             return {
                 'metadata': metadata,
                 'session_info': session_info,
-                'has_raw_data': self.redis_cache.get_dataframe(session_id, "raw_data") is not None,
-                'has_processed_data': self.redis_cache.get_dataframe(session_id, "processed_data") is not None,
-                'has_train_data': self.redis_cache.get_dataframe(session_id, "train_data") is not None,
-                'has_test_data': self.redis_cache.get_dataframe(session_id, "test_data") is not None
+                'has_raw_data': exists["raw_data"],
+                'has_processed_data': exists["processed_data"],
+                'has_train_data': exists["train_data"],
+                'has_test_data': exists["test_data"]
             }
         return None
     
@@ -4,7 +4,8 @@
 """
 
 import os
-import uuid
+import secrets
+import asyncio
 import pandas as pd
 import numpy as np
 from typing import List, Dict, Any, Optional, Tuple
@@ -15,11 +16,126 @@ import logging
 from pathlib import Path
 import zipfile
 import tarfile
+import shutil
+from collections import Counter
 from PIL import Image
 import io
+import warnings
+from concurrent.futures import ThreadPoolExecutor
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pacsv
+import pyarrow.parquet as pq
 
 logger = logging.getLogger(__name__)
 
+# 可选导入orjson库
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+
+# 可选导入python-calamine库 (Rust实现的Excel解析，pandas>=2.2)
+try:
+    import python_calamine
+    HAS_CALAMINE = True
+except ImportError:
+    HAS_CALAMINE = False
+
+# 可选导入TurboJPEG (libjpeg-turbo SIMD解码JPEG)
+try:
+    from turbojpeg import TurboJPEG, TJPF_RGB, TJPF_GRAY
+    _turbo_jpeg = TurboJPEG()
+    HAS_TURBOJPEG = True
+except (ImportError, RuntimeError, OSError):
+    # 没有安装包或找不到libturbojpeg动态库
+    HAS_TURBOJPEG = False
+
+# 可选导入pyvips库
+try:
+    import pyvips
+    HAS_PYVIPS = True
+except (ImportError, OSError):
+    HAS_PYVIPS = False
+
+# 可选导入numba库
+try:
+    from numba import njit, prange, config as numba_config
+    # 处理函数在线程池中执行，需要线程安全的线程层；优先OpenMP
+    numba_config.THREADING_LAYER_PRIORITY = ['omp', 'tbb', 'workqueue']
+    numba_config.THREADING_LAYER = 'threadsafe'
+    HAS_NUMBA = True
+except ImportError:
+    HAS_NUMBA = False
+
+# 上传文件分块写入大小
+UPLOAD_CHUNK_SIZE = 1 << 20
+
+# CSV中视为缺失值的标记 (与pandas默认缺失值标记一致)
+CSV_NULL_VALUES = [
+    '', '#N/A', '#N/A N/A', '#NA', '-1.#IND', '-1.#QNAN', '-NaN', '-nan', '1.#IND', '1.#QNAN',
+    '<NA>', 'N/A', 'NA', 'NULL', 'NaN', 'None', 'n/a', 'nan', 'null'
+]
+
+# 小于该大小的表默认不另存Parquet副本 (重新解析原文件的代价很小)
+PROCESSED_MIN_BYTES = 4 << 20
+
+# 处理后Parquet文件的行组大小 (行组统计信息用于读取时跳过行组)
+PROCESSED_ROW_GROUP_SIZE = 128_000
+
+# 压缩包中按图像数据集统计的文件扩展名
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.bmp', '.tiff')
+
+# 数值列超过该数量时使用numba核函数一次遍历计算所有列的统计量
+NUMBA_STATS_MIN_COLUMNS = 16
+
+if HAS_NUMBA:
+    @njit(parallel=True, cache=True)
+    def _column_stats_numba(arr):
+        """
+        按行存放的各列数据 (n_cols, n_rows) 逐列计算 count/mean/std/min/max (NaN视为缺失)
+        
+        均值和方差使用Welford算法单次遍历累积，避免平方和相减的精度损失
+        """
+        n_cols, n_rows = arr.shape
+        stats = np.full((n_cols, 5), np.nan)
+        for j in prange(n_cols):
+            count = 0
+            mean = 0.0
+            m2 = 0.0
+            low = np.inf
+            high = -np.inf
+            for i in range(n_rows):
+                v = arr[j, i]
+                if np.isnan(v):
+                    continue
+                count += 1
+                delta = v - mean
+                mean += delta / count
+                m2 += delta * (v - mean)
+                if v < low:
+                    low = v
+                if v > high:
+                    high = v
+            stats[j, 0] = count
+            if count > 0:
+                stats[j, 1] = mean
+                stats[j, 3] = low
+                stats[j, 4] = high
+            if count > 1:
+                stats[j, 2] = np.sqrt(m2 / (count - 1))
+        return stats
+
+def _image_shape(path: Path) -> Optional[Tuple[int, int, int]]:
+    """只读取图像文件头获取 (高, 宽, 通道数)，无法识别时返回None"""
+    try:
+        with Image.open(path) as img:
+            width, height = img.size
+            return height, width, len(img.getbands())
+    except (OSError, ValueError, Image.DecompressionBombError):
+        return None
+
 class DataHandler:
     """数据处理器"""
     
@@ -27,6 +143,9 @@ class DataHandler:
         self.upload_dir = Path(upload_dir)
         self.upload_dir.mkdir(exist_ok=True)
         
+        # 会话ID -> 会话上传目录 (每个会话只创建一次)
+        self._session_dirs: Dict[str, Path] = {}
+        
         # 支持的文件格式
         self.supported_formats = {
             'csv': self._process_csv,
@@ -49,40 +168,109 @@ class DataHandler:
         # 最大文件大小 (100MB)
         self.max_file_size = 100 * 1024 * 1024
         
+        # 文件解析、写Parquet、解压都是阻塞操作，放到线程池执行，避免阻塞事件循环
+        self._executor = ThreadPoolExecutor(
+            max_workers=os.cpu_count() or 1,
+            thread_name_prefix="file-worker"
+        )
+        
     async def upload_file(self, file: UploadFile, session_id: str) -> Dict[str, Any]:
         """上传文件并返回文件信息"""
         try:
-            # 验证文件
-            await self._validate_file(file)
+            # 验证文件名/扩展名 (大小在写入时检查)
+            self._validate_file(file)
             
             # 生成唯一文件名
-            file_id = str(uuid.uuid4())
+            file_id = secrets.token_hex(8)
             file_extension = Path(file.filename).suffix.lower().lstrip('.')
-            filename = f"{session_id}_{file_id}.{file_extension}"
-            file_path = self.upload_dir / filename
+            file_path = self._session_dir(session_id) / f"{file_id}.{file_extension}"
             
-            # 保存文件
-            async with aiofiles.open(file_path, 'wb') as f:
-                content = await file.read()
-                await f.write(content)
+            # 保存文件，超过大小上限时立即中止
+            try:
+                in_fd = self._spooled_fileno(file)
+                if in_fd is not None:
+                    file_size = await self._save_with_sendfile(in_fd, file_path)
+                else:
+                    file_size = await self._save_chunked(file, file_path)
+            except BaseException:
+                file_path.unlink(missing_ok=True)
+                raise
             
             # 获取文件信息
             file_info = {
                 'file_id': file_id,
                 'original_name': file.filename,
                 'file_path': str(file_path),
-                'file_size': len(content),
+                'file_size': file_size,
                 'file_type': file_extension,
                 'session_id': session_id
             }
             
-            logger.info(f"文件上传成功: {file.filename} -> {filename}")
+            logger.info(f"文件上传成功: {file.filename} -> {file_path}")
             return file_info
             
+        except HTTPException:
+            raise
         except Exception as e:
             logger.error(f"文件上传失败: {e}")
             raise HTTPException(status_code=500, detail=f"文件上传失败: {str(e)}")
     
+    def _session_dir(self, session_id: str) -> Path:
+        """会话的上传目录 (首次使用时创建)"""
+        session_dir = self._session_dirs.get(session_id)
+        if session_dir is None:
+            session_dir = self.upload_dir / session_id
+            session_dir.mkdir(exist_ok=True)
+            self._session_dirs[session_id] = session_dir
+        return session_dir
+    
+    def _spooled_fileno(self, file: UploadFile) -> Optional[int]:
+        """上传内容已落盘到临时文件时返回其文件描述符，仍在内存中或平台不支持sendfile时返回None"""
+        source = file.file
+        # SpooledTemporaryFile.fileno()会强制把内存内容写到磁盘，先检查是否已经落盘
+        if not hasattr(os, 'sendfile') or not getattr(source, '_rolled', True):
+            return None
+        try:
+            return source.fileno()
+        except (AttributeError, OSError, io.UnsupportedOperation):
+            return None
+    
+    async def _save_with_sendfile(self, in_fd: int, file_path: Path) -> int:
+        """在内核中把临时文件复制到目标文件 (不经过Python字节对象)，返回文件大小"""
+        file_size = os.fstat(in_fd).st_size
+        if file_size > self.max_file_size:
+            raise HTTPException(
+                status_code=413, 
+                detail=f"文件太大，最大支持 {self.max_file_size // (1024*1024)}MB"
+            )
+        
+        def _copy():
+            with open(file_path, 'wb') as f:
+                offset = 0
+                while offset < file_size:
+                    sent = os.sendfile(f.fileno(), in_fd, offset, file_size - offset)
+                    if sent == 0:
+                        break
+                    offset += sent
+            return offset
+        
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, _copy)
+    
+    async def _save_chunked(self, file: UploadFile, file_path: Path) -> int:
+        """分块写入文件，累计大小超过上限时立即中止，返回文件大小"""
+        file_size = 0
+        async with aiofiles.open(file_path, 'wb') as f:
+            while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+                file_size += len(chunk)
+                if file_size > self.max_file_size:
+                    raise HTTPException(
+                        status_code=413, 
+                        detail=f"文件太大，最大支持 {self.max_file_size // (1024*1024)}MB"
+                    )
+                await f.write(chunk)
+        return file_size
+    
     async def process_data(self, file_info: Dict[str, Any], 
                           processing_config: Dict[str, Any] = None) -> Dict[str, Any]:
         """处理数据文件"""
@@ -93,9 +281,12 @@ class DataHandler:
             if file_type not in self.supported_formats:
                 raise ValueError(f"不支持的文件格式: {file_type}")
             
-            # 调用相应的处理函数
+            # 在线程池中调用相应的处理函数
             processor = self.supported_formats[file_type]
-            data_info = await processor(file_path, processing_config or {})
+            loop = asyncio.get_running_loop()
+            data_info = await loop.run_in_executor(
+                self._executor, processor, file_path, processing_config or {}
+            )
             
             # 添加文件信息
             data_info.update({
@@ -111,19 +302,8 @@ class DataHandler:
             logger.error(f"数据处理失败: {e}")
             raise HTTPException(status_code=500, detail=f"数据处理失败: {str(e)}")
     
-    async def _validate_file(self, file: UploadFile):
-        """验证上传的文件"""
-        # 检查文件大小
-        content = await file.read()
-        if len(content) > self.max_file_size:
-            raise HTTPException(
-                status_code=413, 
-                detail=f"文件太大，最大支持 {self.max_file_size // (1024*1024)}MB"
-            )
-        
-        # 重置文件指针
-        await file.seek(0)
-        
+    def _validate_file(self, file: UploadFile):
+        """验证上传的文件 (文件大小在分块写入时检查，避免整个文件读入内存)"""
         # 检查文件扩展名
         if file.filename:
             extension = Path(file.filename).suffix.lower().lstrip('.')
@@ -133,24 +313,32 @@ class DataHandler:
                     detail=f"不支持的文件格式: {extension}"
                 )
     
-    async def _process_csv(self, file_path: Path, config: Dict) -> Dict[str, Any]:
+    def _process_csv(self, file_path: Path, config: Dict) -> Dict[str, Any]:
         """处理CSV文件"""
         try:
-            # 读取CSV
-            df = pd.read_csv(
-                file_path,
-                encoding=config.get('encoding', 'utf-8'),
-                sep=config.get('separator', ','),
-                header=config.get('header', 'infer'),
-                nrows=config.get('max_rows', None)
-            )
+            # 读取CSV (PyArrow多线程解析，失败时回退到pandas)
+            try:
+                table = self._read_csv_table(file_path, config)
+            except (pa.ArrowException, ValueError) as e:
+                logger.debug(f"PyArrow解析CSV失败，回退到pandas: {e}")
+                df = pd.read_csv(
+                    file_path,
+                    encoding=config.get('encoding', 'utf-8'),
+                    sep=config.get('separator', ','),
+                    header=config.get('header', 'infer'),
+                    nrows=config.get('max_rows', None)
+                )
+                table = pa.Table.from_pandas(df, preserve_index=False)
+            table = self._optimize_dtypes(table, config)
             
-            # 数据分析
-            analysis = self._analyze_dataframe(df)
+            # 保存处理后的数据 (直接写Arrow表，无需经过pandas)
+            processed_path = self._write_processed(table, file_path, config)
             
-            # 保存处理后的数据
-            processed_path = file_path.with_suffix('.processed.parquet')
-            df.to_parquet(processed_path)
+            # 数据分析 (统计量直接在Arrow表上计算)
+            df = table.to_pandas(split_blocks=True)
+            analysis = self._analyze_dataframe(df, table)
+            sample_data = self._sample(df, table)
+            del table
             
             return {
                 'data_type': 'tabular',
@@ -159,27 +347,99 @@ class DataHandler:
                 'columns': df.columns.tolist(),
                 'dtypes': df.dtypes.astype(str).to_dict(),
                 'analysis': analysis,
-                'processed_path': str(processed_path),
-                'sample_data': df.head().to_dict('records')
+                'processed_path': str(processed_path) if processed_path else None,
+                'source_path': str(file_path),
+                'sample_data': sample_data
             }
             
         except Exception as e:
             raise ValueError(f"CSV处理失败: {str(e)}")
     
-    async def _process_json(self, file_path: Path, config: Dict) -> Dict[str, Any]:
+    def _write_processed(self, table: pa.Table, file_path: Path, config: Dict) -> Optional[Path]:
+        """
+        将处理后的表写为Parquet (zstd压缩、字典编码、按行组写入统计信息)
+        
+        config['persist']为假时不写入；未指定时小于PROCESSED_MIN_BYTES的表也不写入，
+        此时返回None，调用方通过结果中的source_path读取原文件
+        """
+        persist = config.get('persist')
+        if persist is False or (persist is None and table.nbytes < PROCESSED_MIN_BYTES):
+            return None
+        
+        processed_path = file_path.with_suffix('.processed.parquet')
+        pq.write_table(
+            table,
+            processed_path,
+            compression='zstd',
+            compression_level=3,
+            use_dictionary=True,
+            row_group_size=PROCESSED_ROW_GROUP_SIZE,
+            data_page_size=1 << 20,
+            write_statistics=True
+        )
+        return processed_path
+    
+    def _read_csv_table(self, file_path: Path, config: Dict) -> pa.Table:
+        """使用PyArrow读取CSV为Arrow表"""
+        header = config.get('header', 'infer')
+        if header is not None and header != 'infer' and not isinstance(header, int):
+            raise ValueError("多行表头仅支持pandas解析")
+        
+        read_options = pacsv.ReadOptions(
+            block_size=8 << 20,
+            encoding=config.get('encoding', 'utf-8'),
+            # header为行号时跳过其之前的行；None表示没有表头
+            skip_rows=header if isinstance(header, int) else 0,
+            autogenerate_column_names=header is None
+        )
+        parse_options = pacsv.ParseOptions(delimiter=config.get('separator', ','))
+        convert_options = pacsv.ConvertOptions(null_values=CSV_NULL_VALUES, strings_can_be_null=True)
+        
+        max_rows = config.get('max_rows')
+        if max_rows is None:
+            table = pacsv.read_csv(file_path, read_options=read_options,
+                                   parse_options=parse_options, convert_options=convert_options)
+        else:
+            # 流式读取，够行数后停止
+            batches = []
+            row_count = 0
+            with pacsv.open_csv(file_path, read_options=read_options,
+                                parse_options=parse_options, convert_options=convert_options) as reader:
+                for batch in reader:
+                    batches.append(batch)
+                    row_count += batch.num_rows
+                    if row_count >= max_rows:
+                        break
+                table = pa.Table.from_batches(batches, schema=reader.schema).slice(0, max_rows)
+        
+        if len(set(table.column_names)) != table.num_columns:
+            # PyArrow保留重复列名，交给pandas按 a, a.1 的规则重命名
+            raise ValueError("CSV包含重复列名")
+        
+        if header is None:
+            # 与pandas header=None一致，列名为列号
+            table = table.rename_columns([str(i) for i in range(table.num_columns)])
+        return table
+    
+    def _process_json(self, file_path: Path, config: Dict) -> Dict[str, Any]:
         """处理JSON文件"""
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                data = json.load(f)
+            # orjson直接解析字节，无需先解码为str
+            with open(file_path, 'rb') as f:
+                content = f.read()
+            data = self._loads_json(content)
+            del content
             
-            # 尝试转换为DataFrame
+            # 尝试转换为表格
             if isinstance(data, list) and len(data) > 0:
-                df = pd.DataFrame(data)
-                analysis = self._analyze_dataframe(df)
+                table = self._optimize_dtypes(self._records_to_table(data), config)
+                del data
                 
                 # 保存处理后的数据
-                processed_path = file_path.with_suffix('.processed.parquet')
-                df.to_parquet(processed_path)
+                processed_path = self._write_processed(table, file_path, config)
+                
+                df = table.to_pandas(split_blocks=True)
+                analysis = self._analyze_dataframe(df, table)
                 
                 return {
                     'data_type': 'tabular',
@@ -188,8 +448,9 @@ class DataHandler:
                     'columns': df.columns.tolist(),
                     'dtypes': df.dtypes.astype(str).to_dict(),
                     'analysis': analysis,
-                    'processed_path': str(processed_path),
-                    'sample_data': df.head().to_dict('records')
+                    'processed_path': str(processed_path) if processed_path else None,
+                    'source_path': str(file_path),
+                    'sample_data': self._sample(df, table)
                 }
             else:
                 return {
@@ -203,22 +464,49 @@ class DataHandler:
         except Exception as e:
             raise ValueError(f"JSON处理失败: {str(e)}")
     
-    async def _process_excel(self, file_path: Path, config: Dict) -> Dict[str, Any]:
+    def _loads_json(self, content: bytes) -> Any:
+        """解析JSON字节 (orjson不接受NaN/Infinity等非标准字面量，此时交给json模块)"""
+        if HAS_ORJSON:
+            try:
+                return orjson.loads(content)
+            except orjson.JSONDecodeError:
+                pass
+        return json.loads(content)
+    
+    def _records_to_table(self, data: List[Any]) -> pa.Table:
+        """JSON数组转换为Arrow表 (记录为字典时直接构造，列为所有记录键的并集)"""
+        if all(isinstance(record, dict) for record in data):
+            try:
+                return pa.Table.from_struct_array(pa.array(data))
+            except (pa.ArrowInvalid, pa.ArrowTypeError, pa.ArrowNotImplementedError):
+                # 同一键下类型不一致，交给pandas推断
+                pass
+        return pa.Table.from_pandas(pd.DataFrame(data), preserve_index=False)
+    
+    def _process_excel(self, file_path: Path, config: Dict) -> Dict[str, Any]:
         """处理Excel文件"""
         try:
-            # 读取Excel
-            df = pd.read_excel(
-                file_path,
-                sheet_name=config.get('sheet_name', 0),
-                header=config.get('header', 0),
-                nrows=config.get('max_rows', None)
-            )
-            
-            analysis = self._analyze_dataframe(df)
+            # 读取Excel (优先使用calamine引擎，失败时回退到默认引擎)
+            read_params = {
+                'sheet_name': config.get('sheet_name', 0),
+                'header': config.get('header', 0),
+                'nrows': config.get('max_rows', None)
+            }
+            df = None
+            if HAS_CALAMINE:
+                try:
+                    df = pd.read_excel(file_path, engine='calamine', **read_params)
+                except Exception as e:
+                    logger.debug(f"calamine解析Excel失败，回退到默认引擎: {e}")
+            if df is None:
+                df = pd.read_excel(file_path, **read_params)
+            table = self._optimize_dtypes(pa.Table.from_pandas(df, preserve_index=False), config)
             
             # 保存处理后的数据
-            processed_path = file_path.with_suffix('.processed.parquet')
-            df.to_parquet(processed_path)
+            processed_path = self._write_processed(table, file_path, config)
+            
+            df = table.to_pandas(split_blocks=True)
+            analysis = self._analyze_dataframe(df, table)
             
             return {
                 'data_type': 'tabular',
@@ -227,34 +515,90 @@ class DataHandler:
                 'columns': df.columns.tolist(),
                 'dtypes': df.dtypes.astype(str).to_dict(),
                 'analysis': analysis,
-                'processed_path': str(processed_path),
-                'sample_data': df.head().to_dict('records')
+                'processed_path': str(processed_path) if processed_path else None,
+                'source_path': str(file_path),
+                'sample_data': self._sample(df, table)
             }
             
         except Exception as e:
             raise ValueError(f"Excel处理失败: {str(e)}")
     
-    async def _process_parquet(self, file_path: Path, config: Dict) -> Dict[str, Any]:
-        """处理Parquet文件"""
+    def _process_parquet(self, file_path: Path, config: Dict) -> Dict[str, Any]:
+        """
+        处理Parquet文件
+        
+        默认只读取文件尾部元数据和第一个行组的样本；config['full_scan']为真时读取全部数据做完整分析
+        """
         try:
-            df = pd.read_parquet(file_path)
-            analysis = self._analyze_dataframe(df)
+            columns = config.get('columns')
+            
+            if config.get('full_scan'):
+                # 只读取需要的列；按列拆分数据块转换，避免合并数据块时内存翻倍
+                table = pq.read_table(file_path, columns=columns, use_threads=True, pre_buffer=True)
+                df = table.to_pandas(split_blocks=True)
+                table = self._drop_pandas_index(table)
+                shape = df.shape
+                analysis = self._analyze_dataframe(df, table)
+                sample_data = self._sample(df, table)
+                del table
+            else:
+                pf = pq.ParquetFile(file_path)
+                meta = pf.metadata
+                # 空表转换得到pandas列名和类型 (自动排除保存的索引列)
+                df = pf.schema_arrow.empty_table().to_pandas()
+                if columns is not None:
+                    df = df[columns]
+                shape = (meta.num_rows, len(df.columns))
+                analysis = {
+                    'row_count': meta.num_rows,
+                    'column_count': len(df.columns),
+                    'row_group_count': meta.num_row_groups,
+                    'missing_values': self._parquet_null_counts(meta, df.columns),
+                    'data_types': df.dtypes.astype(str).to_dict(),
+                }
+                sample_data = (self._sample(df, self._drop_pandas_index(pf.read_row_group(0, columns=columns)))
+                               if meta.num_row_groups > 0 else [])
             
             return {
                 'data_type': 'tabular',
                 'format': 'parquet',
-                'shape': df.shape,
+                'shape': shape,
                 'columns': df.columns.tolist(),
                 'dtypes': df.dtypes.astype(str).to_dict(),
                 'analysis': analysis,
                 'processed_path': str(file_path),
-                'sample_data': df.head().to_dict('records')
+                'sample_data': sample_data
             }
             
         except Exception as e:
             raise ValueError(f"Parquet处理失败: {str(e)}")
     
-    async def _process_hdf5(self, file_path: Path, config: Dict) -> Dict[str, Any]:
+    @staticmethod
+    def _drop_pandas_index(table: pa.Table) -> pa.Table:
+        """去掉pandas写入的索引列 (如 __index_level_0__)，与to_pandas得到的数据列保持一致"""
+        pandas_metadata = table.schema.pandas_metadata
+        if not pandas_metadata:
+            return table
+        # RangeIndex以字典形式记录在元数据中，不占用实际列
+        index_columns = {name for name in pandas_metadata.get('index_columns', []) if isinstance(name, str)}
+        if not index_columns.intersection(table.column_names):
+            return table
+        return table.select([i for i, name in enumerate(table.column_names) if name not in index_columns])
+    
+    def _parquet_null_counts(self, meta: pq.FileMetaData, columns) -> Dict[str, int]:
+        """从行组统计信息汇总各列缺失值数量 (没有统计信息的列不计入)"""
+        wanted = set(columns)
+        null_counts: Dict[str, int] = {}
+        for rg in range(meta.num_row_groups):
+            row_group = meta.row_group(rg)
+            for i in range(row_group.num_columns):
+                column = row_group.column(i)
+                stats = column.statistics
+                if column.path_in_schema in wanted and stats is not None and stats.has_null_count:
+                    null_counts[column.path_in_schema] = null_counts.get(column.path_in_schema, 0) + stats.null_count
+        return null_counts
+    
+    def _process_hdf5(self, file_path: Path, config: Dict) -> Dict[str, Any]:
         """处理HDF5文件"""
         try:
             # 这里需要h5py库
@@ -263,34 +607,41 @@ class DataHandler:
             with h5py.File(file_path, 'r') as f:
                 keys = list(f.keys())
                 
-                # 尝试读取第一个数据集
-                if keys:
-                    dataset = f[keys[0]]
-                    data_shape = dataset.shape
-                    data_type = str(dataset.dtype)
-                    
-                    return {
-                        'data_type': 'hdf5',
-                        'format': 'hdf5',
-                        'keys': keys,
-                        'shape': data_shape,
-                        'dtype': data_type,
-                        'processed_path': str(file_path)
-                    }
-                else:
-                    return {
-                        'data_type': 'hdf5',
-                        'format': 'hdf5',
-                        'keys': [],
-                        'processed_path': str(file_path)
-                    }
+                # 一次遍历整个层级，收集所有数据集的形状、类型和磁盘布局 (只读元数据)
+                datasets = {}
+                
+                def _collect(name, obj):
+                    if isinstance(obj, h5py.Dataset):
+                        datasets[name] = {
+                            'shape': obj.shape,
+                            'dtype': str(obj.dtype),
+                            'chunks': obj.chunks,
+                            'compression': obj.compression
+                        }
+                
+                f.visititems(_collect)
+            
+            info = {
+                'data_type': 'hdf5',
+                'format': 'hdf5',
+                'keys': keys,
+                'datasets': datasets,
+                'processed_path': str(file_path)
+            }
+            
+            # 第一个数据集的形状和类型
+            if datasets:
+                first = next(iter(datasets.values()))
+                info['shape'] = first['shape']
+                info['dtype'] = first['dtype']
+            return info
                     
         except ImportError:
             raise ValueError("需要安装h5py库来处理HDF5文件")
         except Exception as e:
             raise ValueError(f"HDF5处理失败: {str(e)}")
     
-    async def _process_image(self, file_path: Path, config: Dict) -> Dict[str, Any]:
+    def _process_image(self, file_path: Path, config: Dict) -> Dict[str, Any]:
         """处理图像文件"""
         try:
             with Image.open(file_path) as img:
@@ -306,7 +657,7 @@ class DataHandler:
                 
                 # 如果需要，转换为numpy数组并保存
                 if config.get('convert_to_array', False):
-                    img_array = np.array(img)
+                    img_array = self._decode_image(file_path, img)
                     processed_path = file_path.with_suffix('.npy')
                     np.save(processed_path, img_array)
                     info['array_path'] = str(processed_path)
@@ -317,75 +668,208 @@ class DataHandler:
         except Exception as e:
             raise ValueError(f"图像处理失败: {str(e)}")
     
-    async def _process_zip(self, file_path: Path, config: Dict) -> Dict[str, Any]:
-        """处理ZIP文件"""
+    def _decode_image(self, file_path: Path, img: Image.Image) -> np.ndarray:
+        """
+        解码图像为numpy数组 (与np.array(img)结果一致)
+        
+        JPEG优先使用TurboJPEG，其它格式优先使用pyvips顺序解码；调色板、CMYK等模式交给PIL
+        """
+        image_format = (img.format or '').lower()
+        if HAS_TURBOJPEG and image_format == 'jpeg' and img.mode in ('RGB', 'L'):
+            with open(file_path, 'rb') as f:
+                jpeg_data = f.read()
+            if img.mode == 'L':
+                # 灰度输出带有单通道维度，去掉以与PIL一致
+                return _turbo_jpeg.decode(jpeg_data, pixel_format=TJPF_GRAY)[:, :, 0]
+            return _turbo_jpeg.decode(jpeg_data, pixel_format=TJPF_RGB)
+        
+        if HAS_PYVIPS and img.mode in ('RGB', 'RGBA', 'L'):
+            array = pyvips.Image.new_from_file(str(file_path), access='sequential').numpy()
+            return array[:, :, 0] if array.ndim == 3 and img.mode == 'L' else array
+        
+        return np.asarray(img)
+    
+    def _process_zip(self, file_path: Path, config: Dict) -> Dict[str, Any]:
+        """
+        处理ZIP文件
+        
+        默认只读取目录信息；config['extract']为真时解压到磁盘并统计图像
+        """
         try:
-            extract_dir = file_path.parent / f"{file_path.stem}_extracted"
-            extract_dir.mkdir(exist_ok=True)
-            
             with zipfile.ZipFile(file_path, 'r') as zip_ref:
-                zip_ref.extractall(extract_dir)
-                file_list = zip_ref.namelist()
+                members = zip_ref.infolist()
+                file_list = [member.filename for member in members]
+                info = {
+                    'data_type': 'archive',
+                    'format': 'zip',
+                    'file_count': len(file_list),
+                    'file_list': file_list[:10],  # 只显示前10个文件
+                    'uncompressed_size': sum(member.file_size for member in members),
+                    'processed_path': str(file_path)
+                }
+                
+                if config.get('extract', False):
+                    extract_dir = file_path.parent / f"{file_path.stem}_extracted"
+                    extract_dir.mkdir(exist_ok=True)
+                    zip_ref.extractall(extract_dir)
             
-            return {
-                'data_type': 'archive',
-                'format': 'zip',
-                'extracted_path': str(extract_dir),
-                'file_count': len(file_list),
-                'file_list': file_list[:10],  # 只显示前10个文件
-                'processed_path': str(extract_dir)
-            }
+            if config.get('extract', False):
+                info['extracted_path'] = info['processed_path'] = str(extract_dir)
+                info.update(self._summarize_images(extract_dir, file_list))
+            return info
             
         except Exception as e:
             raise ValueError(f"ZIP处理失败: {str(e)}")
     
-    async def _process_tar(self, file_path: Path, config: Dict) -> Dict[str, Any]:
-        """处理TAR文件"""
+    def _process_tar(self, file_path: Path, config: Dict) -> Dict[str, Any]:
+        """
+        处理TAR文件
+        
+        默认只读取成员信息；config['extract']为真时解压到磁盘并统计图像
+        """
         try:
-            extract_dir = file_path.parent / f"{file_path.stem}_extracted"
-            extract_dir.mkdir(exist_ok=True)
-            
             with tarfile.open(file_path, 'r:*') as tar_ref:
-                tar_ref.extractall(extract_dir)
-                file_list = tar_ref.getnames()
+                members = tar_ref.getmembers()
+                file_list = [member.name for member in members]
+                info = {
+                    'data_type': 'archive',
+                    'format': 'tar',
+                    'file_count': len(file_list),
+                    'file_list': file_list[:10],
+                    'uncompressed_size': sum(member.size for member in members if member.isfile()),
+                    'processed_path': str(file_path)
+                }
+                
+                if config.get('extract', False):
+                    extract_dir = file_path.parent / f"{file_path.stem}_extracted"
+                    extract_dir.mkdir(exist_ok=True)
+                    tar_ref.extractall(extract_dir)
             
-            return {
-                'data_type': 'archive',
-                'format': 'tar',
-                'extracted_path': str(extract_dir),
-                'file_count': len(file_list),
-                'file_list': file_list[:10],
-                'processed_path': str(extract_dir)
-            }
+            if config.get('extract', False):
+                info['extracted_path'] = info['processed_path'] = str(extract_dir)
+                info.update(self._summarize_images(extract_dir, file_list))
+            return info
             
         except Exception as e:
             raise ValueError(f"TAR处理失败: {str(e)}")
     
-    def _analyze_dataframe(self, df: pd.DataFrame) -> Dict[str, Any]:
-        """分析DataFrame的统计信息"""
+    def _summarize_images(self, extract_dir: Path, file_list: List[str]) -> Dict[str, Any]:
+        """
+        统计解压目录中的图像数量和尺寸分布，供前端预览数据集
+        
+        只读取文件头，多个文件在独立线程池中并行读取 (当前任务已占用处理线程池的线程)
+        """
+        image_paths = [extract_dir / name for name in file_list if name.lower().endswith(IMAGE_EXTENSIONS)]
+        if not image_paths:
+            return {}
+        
+        with ThreadPoolExecutor(max_workers=min(32, (os.cpu_count() or 1) * 4),
+                                thread_name_prefix="image-header") as pool:
+            shapes = Counter(shape for shape in pool.map(_image_shape, image_paths) if shape is not None)
+        
+        return {
+            'image_count': sum(shapes.values()),
+            'image_shapes': [
+                {'shape': list(shape), 'count': count}
+                for shape, count in shapes.most_common(10)
+            ]
+        }
+    
+    def _optimize_dtypes(self, table: pa.Table, config: Dict) -> pa.Table:
+        """
+        压缩列类型后再分析和写入Parquet (config['downcast']为假时跳过)
+        
+        整数列降为能容纳取值范围的最小有符号类型；float64仅在往返转换无损时降为float32；
+        低基数字符串列做字典编码 (转换为pandas后为category)
+        """
+        if not config.get('downcast', True) or table.num_rows == 0:
+            return table
+        
+        for i, column in enumerate(table.columns):
+            column_type = column.type
+            target = None
+            if pa.types.is_signed_integer(column_type) and column.null_count < len(column):
+                min_max = pc.min_max(column)
+                low, high = min_max['min'].as_py(), min_max['max'].as_py()
+                for candidate in (pa.int8(), pa.int16(), pa.int32()):
+                    info = np.iinfo(candidate.to_pandas_dtype())
+                    if candidate.bit_width < column_type.bit_width and info.min <= low and high <= info.max:
+                        target = candidate
+                        break
+            elif pa.types.is_float64(column_type):
+                values = column.to_numpy()
+                with np.errstate(over='ignore'):
+                    roundtrip = values.astype(np.float32).astype(np.float64)
+                if np.array_equal(roundtrip, values, equal_nan=True):
+                    target = pa.float32()
+            elif pa.types.is_string(column_type) or pa.types.is_large_string(column_type):
+                if pc.count_distinct(column).as_py() < 0.5 * len(column):
+                    table = table.set_column(i, table.field(i).name, column.dictionary_encode())
+            
+            if target is not None:
+                table = table.set_column(i, table.field(i).name, column.cast(target))
+        return table
+    
+    def _sample(self, df: pd.DataFrame, table: Optional[pa.Table] = None, n_rows: int = 5) -> List[Dict[str, Any]]:
+        """前n行样本记录 (Arrow在C++中构造Python对象，缺失值转为None)"""
         try:
+            if table is None:
+                table = pa.Table.from_pandas(df.head(n_rows), preserve_index=False)
+            return table.slice(0, n_rows).to_pylist()
+        except (pa.ArrowInvalid, pa.ArrowNotImplementedError, pa.ArrowTypeError):
+            return df.head(n_rows).to_dict('records')
+    
+    def _analyze_dataframe(self, df: pd.DataFrame, table: Optional[pa.Table] = None) -> Dict[str, Any]:
+        """
+        分析DataFrame的统计信息
+        
+        统计量在Arrow表上用计算内核逐列聚合；已有Arrow表时直接传入table，避免再次转换
+        """
+        try:
+            if table is None:
+                try:
+                    table = pa.Table.from_pandas(df, preserve_index=False)
+                except (pa.ArrowInvalid, pa.ArrowNotImplementedError, pa.ArrowTypeError) as e:
+                    # 混合类型的object列无法转换为Arrow
+                    logger.debug(f"Arrow转换失败，回退到pandas分析: {e}")
+                    return self._analyze_dataframe_pandas(df)
+            
             analysis = {
-                'row_count': len(df),
-                'column_count': len(df.columns),
-                'memory_usage': df.memory_usage(deep=True).sum(),
-                'missing_values': df.isnull().sum().to_dict(),
+                'row_count': table.num_rows,
+                'column_count': table.num_columns,
+                'memory_usage': self._estimate_memory(df, table),
+                'missing_values': {name: column.null_count for name, column in zip(df.columns, table.columns)},
                 'data_types': df.dtypes.astype(str).to_dict(),
             }
             
-            # 数值列统计
-            numeric_columns = df.select_dtypes(include=[np.number]).columns
-            if len(numeric_columns) > 0:
-                analysis['numeric_summary'] = df[numeric_columns].describe().to_dict()
+            numeric_columns = {}
+            categorical_summary = {}
+            for name, column in zip(df.columns, table.columns):
+                column_type = column.type
+                if pa.types.is_integer(column_type) or pa.types.is_floating(column_type):
+                    numeric_columns[name] = column
+                elif (pa.types.is_string(column_type) or pa.types.is_large_string(column_type)
+                      or pa.types.is_dictionary(column_type)):
+                    if pa.types.is_dictionary(column_type):
+                        # category列解码为取值数组再聚合
+                        column = column.cast(column_type.value_type)
+                    categorical_summary[name] = {
+                        'unique_count': pc.count_distinct(column).as_py(),
+                        'top_values': self._top_values(column)
+                    }
+            
+            # 数值列统计 (列数较多时一次遍历计算所有列)
+            numeric_summary = None
+            if HAS_NUMBA and len(numeric_columns) > NUMBA_STATS_MIN_COLUMNS and table.num_rows > 0:
+                numeric_summary = self._numeric_stats_numba(numeric_columns)
+            if numeric_summary is None:
+                numeric_summary = {name: self._numeric_stats(column) for name, column in numeric_columns.items()}
+            if numeric_summary:
+                analysis['numeric_summary'] = numeric_summary
             
             # 分类列统计
-            categorical_columns = df.select_dtypes(include=['object', 'category']).columns
-            if len(categorical_columns) > 0:
-                analysis['categorical_summary'] = {}
-                for col in categorical_columns:
-                    analysis['categorical_summary'][col] = {
-                        'unique_count': df[col].nunique(),
-                        'top_values': df[col].value_counts().head().to_dict()
-                    }
+            if categorical_summary:
+                analysis['categorical_summary'] = categorical_summary
             
             return analysis
             
@@ -393,15 +877,103 @@ class DataHandler:
             logger.warning(f"数据分析失败: {e}")
             return {'error': str(e)}
     
+    def _analyze_dataframe_pandas(self, df: pd.DataFrame) -> Dict[str, Any]:
+        """使用pandas分析DataFrame (无法转换为Arrow时使用)"""
+        analysis = {
+            'row_count': len(df),
+            'column_count': len(df.columns),
+            'memory_usage': df.memory_usage(deep=True).sum(),
+            'missing_values': df.isnull().sum().to_dict(),
+            'data_types': df.dtypes.astype(str).to_dict(),
+        }
+        
+        # 数值列统计
+        numeric_columns = df.select_dtypes(include=[np.number]).columns
+        if len(numeric_columns) > 0:
+            analysis['numeric_summary'] = df[numeric_columns].describe().to_dict()
+        
+        # 分类列统计
+        categorical_columns = df.select_dtypes(include=['object', 'category']).columns
+        if len(categorical_columns) > 0:
+            analysis['categorical_summary'] = {}
+            for col in categorical_columns:
+                analysis['categorical_summary'][col] = {
+                    'unique_count': df[col].nunique(),
+                    'top_values': df[col].value_counts().head().to_dict()
+                }
+        
+        return analysis
+    
+    def _numeric_stats(self, column: pa.ChunkedArray) -> Dict[str, Any]:
+        """数值列统计 (与DataFrame.describe格式一致，分位数为线性插值的精确值)"""
+        min_max = pc.min_max(column)
+        q1, median, q3 = pc.quantile(column, q=[0.25, 0.5, 0.75]).to_pylist() or [None] * 3
+        return {
+            'count': float(len(column) - column.null_count),
+            'mean': pc.mean(column).as_py(),
+            'std': pc.stddev(column, ddof=1).as_py(),
+            'min': min_max['min'].as_py(),
+            '25%': q1,
+            '50%': median,
+            '75%': q3,
+            'max': min_max['max'].as_py()
+        }
+    
+    def _numeric_stats_numba(self, numeric_columns: Dict[Any, pa.ChunkedArray]) -> Optional[Dict[Any, Dict[str, Any]]]:
+        """多个数值列统计 (与DataFrame.describe格式一致)，核函数不可用时返回None"""
+        # 每列连续存放，核函数按列并行时顺序访问内存 (缺失值转为NaN)
+        arr = np.empty((len(numeric_columns), len(next(iter(numeric_columns.values())))), dtype=np.float64)
+        for j, column in enumerate(numeric_columns.values()):
+            arr[j] = column.to_numpy()
+        
+        try:
+            stats = _column_stats_numba(arr)
+        except ValueError as e:
+            # 没有可用的线程安全线程层
+            logger.debug(f"numba核函数不可用，使用Arrow逐列计算: {e}")
+            return None
+        
+        with warnings.catch_warnings():
+            # 全部为缺失值的列分位数为NaN
+            warnings.simplefilter('ignore', RuntimeWarning)
+            quantiles = np.nanquantile(arr, [0.25, 0.5, 0.75], axis=1)
+        
+        summary = {}
+        for j, name in enumerate(numeric_columns):
+            count, mean, std, low, high = stats[j]
+            q1, median, q3 = quantiles[:, j]
+            summary[name] = {
+                'count': float(count),
+                'mean': float(mean),
+                'std': float(std),
+                'min': float(low),
+                '25%': float(q1),
+                '50%': float(median),
+                '75%': float(q3),
+                'max': float(high)
+            }
+        return summary
+    
+    def _top_values(self, column: pa.ChunkedArray, n: int = 5) -> Dict[Any, int]:
+        """出现次数最多的n个值 (不含缺失值，与value_counts().head()一致)"""
+        counts = pc.value_counts(column)
+        counts = counts.filter(pc.is_valid(counts.field('values')))
+        top = counts.take(pc.select_k_unstable(counts.field('counts'), k=n, sort_keys=[('dummy', 'descending')]))
+        return {item['values']: item['counts'] for item in top.to_pylist()}
+    
+    def _estimate_memory(self, df: pd.DataFrame, table: pa.Table) -> int:
+        """内存占用估算: 浅层占用加字符串列的UTF-8字节数，避免memory_usage(deep=True)逐个访问Python对象"""
+        memory_usage = int(df.memory_usage(deep=False).sum())
+        for dtype, column in zip(df.dtypes, table.columns):
+            if dtype == object and (pa.types.is_string(column.type) or pa.types.is_large_string(column.type)):
+                memory_usage += pc.sum(pc.utf8_length(column)).as_py() or 0
+        return memory_usage
+    
     def cleanup_session_files(self, session_id: str):
         """清理会话相关的文件"""
         try:
-            for file_path in self.upload_dir.glob(f"{session_id}_*"):
-                if file_path.is_file():
-                    file_path.unlink()
-                elif file_path.is_dir():
-                    import shutil
-                    shutil.rmtree(file_path)
+            session_dir = self._session_dirs.pop(session_id, self.upload_dir / session_id)
+            shutil.rmtree(session_dir, ignore_errors=True)
             logger.info(f"清理会话 {session_id} 的文件")
         except Exception as e:
             logger.error(f"清理文件失败: {e}")
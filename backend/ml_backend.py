@@ -3,15 +3,20 @@
 机器学习后端 - 集成Redis临时缓存
 """
 
-from fastapi import FastAPI, HTTPException, UploadFile, File, WebSocket, WebSocketDisconnect
+from fastapi import FastAPI, HTTPException, UploadFile, File, WebSocket, WebSocketDisconnect, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, ORJSONResponse
 from pydantic import BaseModel
 from typing import Dict, List, Optional, Any
 import logging
 import asyncio
 import json
 import uuid
+import functools
+import hashlib
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from types import SimpleNamespace
 import numpy as np
@@ -29,15 +34,44 @@ from ml_converters.tensorflow_converter import TensorFlowConverter
 from ml_converters.pytorch_converter import PyTorchConverter
 from ml_model_builder import model_builder
 
+# 可选导入orjson库
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+
+# 可选导入uvloop库 (基于libuv的事件循环，WebSocket推送和请求调度开销更低)
+try:
+    import uvloop
+    HAS_UVLOOP = True
+except ImportError:
+    HAS_UVLOOP = False
+
+# 可选导入httptools库 (C实现的HTTP解析器)
+try:
+    import httptools
+    HAS_HTTPTOOLS = True
+except ImportError:
+    HAS_HTTPTOOLS = False
+
+# uvicorn使用的事件循环和HTTP协议实现
+UVICORN_LOOP = "uvloop" if HAS_UVLOOP else "asyncio"
+UVICORN_HTTP = "httptools" if HAS_HTTPTOOLS else "h11"
+
 # 配置日志
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# 响应体在事件循环线程中序列化，有orjson时用其替代标准库json
+APIResponse = ORJSONResponse if HAS_ORJSON else JSONResponse
+
 # 创建FastAPI应用
 app = FastAPI(
     title="ML Visual Builder Backend",
     description="机器学习可视化构建器后端 - 支持Redis临时缓存",
-    version="2.0.0"
+    version="2.0.0",
+    default_response_class=APIResponse
 )
 
 # 配置CORS
@@ -59,34 +93,282 @@ app.add_middleware(
 redis_cache = get_redis_cache()
 data_processor = TempDataProcessor()
 session_manager = MLSessionManager()
-tf_converter = TensorFlowConverter()
-pytorch_converter = PyTorchConverter()
+
+# 训练中的阻塞操作 (导入TensorFlow、构建编译模型、准备数据、fit) 在专用线程池中执行，
+# 不占用事件循环，也不与默认线程池中的其他任务争抢
+TRAINING_MAX_WORKERS = int(os.getenv('TRAINING_MAX_WORKERS', min(4, os.cpu_count() or 1)))
+_training_pool = ThreadPoolExecutor(max_workers=TRAINING_MAX_WORKERS, thread_name_prefix="training")
+
+# Keras精度策略是进程级全局状态，层在创建时读取: 设置策略到模型编译完成之间持有该锁，
+# 避免并发训练任务互相覆盖策略
+_model_build_lock = threading.Lock()
+
+# 模型转换器与会话无关，按框架首次使用时创建，之后复用同一实例
+_CONVERTER_CLASSES = {
+    "tensorflow": TensorFlowConverter,
+    "pytorch": PyTorchConverter,
+}
+
+@functools.lru_cache(maxsize=None)
+def _get_converter(framework: str):
+    """获取框架对应的转换器，不支持的框架返回None"""
+    converter_class = _CONVERTER_CLASSES.get(framework)
+    return converter_class() if converter_class else None
+
+def _loads_message(data: str) -> Any:
+    """解析客户端发来的WebSocket消息"""
+    if HAS_ORJSON:
+        return orjson.loads(data)
+    return json.loads(data)
+
+def _dumps_message(message: dict) -> str:
+    """序列化WebSocket消息 (有orjson时在C中完成，并支持numpy标量和数组)"""
+    if HAS_ORJSON:
+        return orjson.dumps(message, option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS).decode()
+    return json.dumps(message)
+
+# 响应中时间戳的刷新间隔 (秒)
+NOW_ISO_REFRESH_INTERVAL = 0.5
+_now_iso_cache = (float('-inf'), '')
+
+def _now_iso() -> str:
+    """当前时间的ISO字符串，间隔内的重复调用复用同一结果 (用于健康检查、心跳等高频响应)"""
+    global _now_iso_cache
+    now = time.monotonic()
+    if now - _now_iso_cache[0] >= NOW_ISO_REFRESH_INTERVAL:
+        _now_iso_cache = (now, datetime.now().isoformat())
+    return _now_iso_cache[1]
 
 # WebSocket连接管理
 class ConnectionManager:
+    """
+    WebSocket连接管理
+    
+    多worker部署时每个进程只持有自己的连接：目标连接不在本进程时，消息发布到Redis频道
+    ws:<session_id>，持有该连接的worker订阅后转发；广播发布到 ws-broadcast，各worker向本地连接发送
+    """
+
     def __init__(self):
+        # 写时复制: 连接变化时整体替换为新字典，发送时持有的快照不会在await期间被修改
         self.active_connections: Dict[str, WebSocket] = {}
+        self._listener: Optional[asyncio.Task] = None
 
     async def connect(self, websocket: WebSocket, session_id: str):
         await websocket.accept()
-        self.active_connections[session_id] = websocket
+        self.active_connections = {**self.active_connections, session_id: websocket}
+        self._ensure_listener()
         logger.info(f"WebSocket连接建立: {session_id}")
 
     def disconnect(self, session_id: str):
         if session_id in self.active_connections:
-            del self.active_connections[session_id]
+            connections = dict(self.active_connections)
+            del connections[session_id]
+            self.active_connections = connections
             logger.info(f"WebSocket连接断开: {session_id}")
 
-    async def send_message(self, session_id: str, message: dict):
-        if session_id in self.active_connections:
+    def _ensure_listener(self):
+        """本进程首次有连接时启动Redis订阅 (内存缓存模式下只有单进程，无需订阅)"""
+        if (self._listener is None or self._listener.done()) and redis_cache._is_redis_available():
+            self._listener = asyncio.create_task(self._listen())
+
+    async def _listen(self):
+        """把其它worker发布的消息转发给本进程持有的连接，订阅中断 (如Redis断开) 后退避重连"""
+        delay = PUBSUB_RECONNECT_MIN_DELAY
+        while True:
+            pubsub = redis_cache.apubsub()
+            if pubsub is None:
+                return
             try:
-                await self.active_connections[session_id].send_text(json.dumps(message))
+                await pubsub.psubscribe(WS_CHANNEL_PREFIX + '*')
+                await pubsub.subscribe(WS_BROADCAST_CHANNEL)
+                delay = PUBSUB_RECONNECT_MIN_DELAY
+                async for item in pubsub.listen():
+                    if item['type'] not in ('message', 'pmessage'):
+                        continue
+                    channel = item['channel'].decode('utf-8')
+                    payload = item['data'].decode('utf-8')
+                    if channel == WS_BROADCAST_CHANNEL:
+                        await self._broadcast_local(payload)
+                    else:
+                        session_id = channel[len(WS_CHANNEL_PREFIX):]
+                        websocket = self.active_connections.get(session_id)
+                        if websocket is not None and not await self._send_text(websocket, payload):
+                            self.disconnect(session_id)
             except Exception as e:
-                logger.error(f"发送WebSocket消息失败: {e}")
+                logger.error(f"WebSocket消息订阅中断，{delay:.1f}秒后重连: {e}")
+            finally:
+                try:
+                    await pubsub.reset()
+                except Exception:
+                    pass
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, PUBSUB_RECONNECT_MAX_DELAY)
+
+    async def _send_text(self, websocket: WebSocket, payload: str) -> bool:
+        """发送已序列化的消息，失败或超时返回False"""
+        try:
+            await asyncio.wait_for(websocket.send_text(payload), timeout=WS_SEND_TIMEOUT)
+            return True
+        except Exception as e:
+            logger.error(f"发送WebSocket消息失败: {e}")
+            return False
+
+    async def send_message(self, session_id: str, message: dict):
+        if session_id in self.active_connections or redis_cache._is_redis_available():
+            await self.send_payload(session_id, _dumps_message(message))
+
+    async def send_payload(self, session_id: str, payload: str):
+        """发送已序列化的消息 (内容固定的消息可以预先序列化后重复使用)"""
+        websocket = self.active_connections.get(session_id)
+        if websocket is None:
+            # 连接可能在其它worker上
+            await redis_cache.apublish(WS_CHANNEL_PREFIX + session_id, payload)
+        elif not await self._send_text(websocket, payload):
+            self.disconnect(session_id)
+
+    async def broadcast(self, message: dict):
+        """向所有连接发送同一消息 (只序列化一次；有Redis时经频道发给所有worker，包括本进程)"""
+        payload = _dumps_message(message)
+        if redis_cache._is_redis_available():
+            await redis_cache.apublish(WS_BROADCAST_CHANNEL, payload)
+        else:
+            await self._broadcast_local(payload)
+
+    async def _broadcast_local(self, payload: str):
+        """向本进程的所有连接并发发送，慢客户端不会阻塞其它客户端"""
+        if not self.active_connections:
+            return
+        semaphore = asyncio.Semaphore(WS_BROADCAST_CONCURRENCY)
+
+        async def _send(websocket: WebSocket) -> bool:
+            async with semaphore:
+                return await self._send_text(websocket, payload)
+
+        connections = self.active_connections
+        results = await asyncio.gather(*(_send(websocket) for websocket in connections.values()))
+        for (session_id, websocket), ok in zip(connections.items(), results):
+            # 发送期间客户端可能已重新连接，只移除失败的那个连接
+            if not ok and self.active_connections.get(session_id) is websocket:
                 self.disconnect(session_id)
 
+    async def forward_progress(self, session_id: str, queue: asyncio.Queue):
+        """
+        将队列中的训练进度推送给客户端，收到None时结束
+        
+        每次只发送积压更新中的最新一条，并限制发送频率，训练很快时不会占满事件循环
+        """
+        finished = False
+        while not finished:
+            message = await queue.get()
+            if message is None:
+                break
+            while not queue.empty():
+                latest = queue.get_nowait()
+                if latest is None:
+                    finished = True
+                    break
+                message = latest
+            await self.send_message(session_id, message)
+            if not finished:
+                await asyncio.sleep(PROGRESS_MIN_INTERVAL)
+
 manager = ConnectionManager()
 
+# 训练进度推送的最小间隔 (秒)，期间积压的更新只发送最新一条
+PROGRESS_MIN_INTERVAL = 0.05
+
+# 内容固定的训练状态消息，启动时序列化一次
+_TRAINING_STARTED_PAYLOAD = _dumps_message({
+    "type": "training_status",
+    "status": "started",
+    "message": "开始训练模型"
+})
+
+# WebSocket单次发送超时 (秒)，超时的连接视为断开
+WS_SEND_TIMEOUT = 5.0
+
+# 广播时同时进行的发送数上限
+WS_BROADCAST_CONCURRENCY = 100
+
+# 多worker部署时转发WebSocket消息的Redis频道
+WS_CHANNEL_PREFIX = "ws:"
+WS_BROADCAST_CHANNEL = "ws-broadcast"
+
+# Redis订阅中断后的重连等待时间 (秒)，按指数退避增长到上限
+PUBSUB_RECONNECT_MIN_DELAY = 0.5
+PUBSUB_RECONNECT_MAX_DELAY = 30.0
+
+# ==================== 会话缓存 ====================
+
+# 会话信息的进程内缓存时间 (秒)，期间重复请求不再访问Redis
+SESSION_CACHE_TTL = 5.0
+SESSION_CACHE_MAXSIZE = 4096
+
+# 活跃会话ID列表的缓存时间 (秒)
+ACTIVE_SESSIONS_CACHE_TTL = 1.0
+
+class _TTLCache:
+    """带过期时间的进程内缓存 (只在事件循环线程中访问，无需加锁)"""
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: Dict[str, tuple] = {}
+
+    def get(self, key: str):
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del self._data[key]
+            return None
+        return value
+
+    def set(self, key: str, value) -> None:
+        now = time.monotonic()
+        if key not in self._data and len(self._data) >= self.maxsize:
+            # 先清理过期项，仍然满则淘汰最早写入的一项
+            self._data = {k: v for k, v in self._data.items() if v[0] >= now}
+            if len(self._data) >= self.maxsize:
+                del self._data[next(iter(self._data))]
+        self._data[key] = (now + self.ttl, value)
+
+    def pop(self, key: str) -> None:
+        self._data.pop(key, None)
+
+    def clear(self) -> None:
+        self._data.clear()
+
+session_info_cache = _TTLCache(SESSION_CACHE_MAXSIZE, SESSION_CACHE_TTL)
+active_sessions_cache = _TTLCache(1, ACTIVE_SESSIONS_CACHE_TTL)
+
+# 健康检查中Redis相关状态的缓存时间 (秒)，负载均衡器的高频探测不再每次访问Redis
+HEALTH_CACHE_TTL = 1.0
+health_cache = _TTLCache(1, HEALTH_CACHE_TTL)
+
+def _get_session_info_cached(session_id: str) -> Optional[Dict]:
+    """获取会话信息，优先读进程内缓存，未命中再访问Redis"""
+    session_info = session_info_cache.get(session_id)
+    if session_info is None:
+        session_info = redis_cache.get_session_info(session_id)
+        if session_info:
+            session_info_cache.set(session_id, session_info)
+    return session_info
+
+def _get_active_sessions_cached() -> List[str]:
+    """获取活跃会话ID列表，短时间内的重复请求复用同一结果"""
+    session_ids = active_sessions_cache.get("ids")
+    if session_ids is None:
+        session_ids = redis_cache.get_all_active_sessions()
+        active_sessions_cache.set("ids", session_ids)
+    return session_ids
+
+def _invalidate_session_cache(session_id: str) -> None:
+    """会话创建、删除或内容变化后清除对应缓存"""
+    session_info_cache.pop(session_id)
+    active_sessions_cache.clear()
+
 # ==================== 数据模型 ====================
 
 class SessionCreate(BaseModel):
@@ -128,18 +410,21 @@ async def root():
 async def health_check():
     """健康检查"""
     try:
-        # 检查Redis连接
-        redis_status = "connected" if redis_cache._is_redis_available() else "memory_fallback"
-        
-        # 获取缓存使用情况
-        cache_info = redis_cache.get_memory_usage()
+        status = health_cache.get("status")
+        if status is None:
+            status = {
+                # 检查Redis连接
+                "redis_status": "connected" if redis_cache._is_redis_available() else "memory_fallback",
+                # 获取缓存使用情况
+                "cache_info": redis_cache.get_memory_usage(),
+                "active_sessions": redis_cache.count_active_sessions()
+            }
+            health_cache.set("status", status)
         
         return {
             "status": "healthy",
-            "timestamp": datetime.now().isoformat(),
-            "redis_status": redis_status,
-            "cache_info": cache_info,
-            "active_sessions": len(redis_cache.get_all_active_sessions())
+            "timestamp": _now_iso(),
+            **status
         }
     except Exception as e:
         logger.error(f"健康检查失败: {e}")
@@ -167,6 +452,7 @@ async def create_session(session_data: SessionCreate):
         success = redis_cache.store_session_info(session_id, session_info)
         if not success:
             raise HTTPException(status_code=500, detail="创建会话失败")
+        _invalidate_session_cache(session_id)
         
         logger.info(f"创建新会话: {session_id}")
         
@@ -184,7 +470,7 @@ async def create_session(session_data: SessionCreate):
 async def get_session(session_id: str):
     """获取会话信息"""
     try:
-        session_info = redis_cache.get_session_info(session_id)
+        session_info = _get_session_info_cached(session_id)
         if not session_info:
             raise HTTPException(status_code=404, detail="会话不存在")
         
@@ -206,13 +492,17 @@ async def get_session(session_id: str):
 async def list_sessions():
     """获取所有活跃会话"""
     try:
-        session_ids = redis_cache.get_all_active_sessions()
-        sessions = []
+        session_ids = _get_active_sessions_cached()
+        cached = {session_id: session_info_cache.get(session_id) for session_id in session_ids}
         
-        for session_id in session_ids:
-            session_info = redis_cache.get_session_info(session_id)
+        # 缓存未命中的会话在一次往返中批量读取
+        missing = [session_id for session_id, info in cached.items() if info is None]
+        for session_id, session_info in zip(missing, redis_cache.get_session_infos_bulk(missing)):
             if session_info:
-                sessions.append(session_info)
+                session_info_cache.set(session_id, session_info)
+                cached[session_id] = session_info
+        
+        sessions = [info for info in cached.values() if info]
         
         return {
             "success": True,
@@ -230,6 +520,7 @@ async def delete_session(session_id: str):
     try:
         # 清理会话数据
         success = redis_cache.clear_session_data(session_id)
+        _invalidate_session_cache(session_id)
         
         # 断开WebSocket连接
         manager.disconnect(session_id)
@@ -252,12 +543,13 @@ async def upload_data(session_id: str, file: UploadFile = File(...)):
     """上传数据文件"""
     try:
         # 检查会话是否存在
-        session_info = redis_cache.get_session_info(session_id)
+        session_info = _get_session_info_cached(session_id)
         if not session_info:
             raise HTTPException(status_code=404, detail="会话不存在")
         
-        # 处理文件
+        # 处理文件 (会更新会话信息中的数据状态)
         result = await data_processor.upload_and_process(session_id, file)
+        _invalidate_session_cache(session_id)
         
         # 通过WebSocket发送进度更新
         await manager.send_message(session_id, {
@@ -278,7 +570,7 @@ async def upload_data(session_id: str, file: UploadFile = File(...)):
 async def get_data_info(session_id: str):
     """获取数据信息"""
     try:
-        data_info = data_processor.get_data_info(session_id)
+        data_info = await asyncio.to_thread(data_processor.get_data_info, session_id)
         if not data_info:
             raise HTTPException(status_code=404, detail="未找到数据")
         
@@ -297,7 +589,7 @@ async def get_data_info(session_id: str):
 async def get_data_preview(session_id: str, data_type: str = "raw_data"):
     """获取数据预览"""
     try:
-        preview = data_processor.get_data_preview(session_id, data_type)
+        preview = await asyncio.to_thread(data_processor.get_data_preview, session_id, data_type)
         if not preview:
             raise HTTPException(status_code=404, detail="未找到数据")
         
@@ -313,6 +605,106 @@ async def get_data_preview(session_id: str, data_type: str = "raw_data"):
         logger.error(f"获取数据预览失败: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+# ==================== Keras层构建 ====================
+
+def _parse_shape(val):
+    if isinstance(val, (list, tuple)):
+        return list(val)
+    if isinstance(val, str):
+        s = val.replace('(', '').replace(')', '')
+        parts = [p.strip() for p in s.split(',') if p.strip()]
+        out = []
+        for p in parts:
+            if p.lower() in ("none", "null"):
+                out.append(None)
+            else:
+                try:
+                    out.append(int(p))
+                except Exception:
+                    out.append(None)
+        return out
+    return None
+
+# 每个构建函数接收 (layers模块, 层配置, 是否第一层, 是否MNIST数据, CSV特征数)，返回要依次添加的Keras层
+
+def _build_conv2d(layers, cfg, first, has_mnist, feature_dim):
+    filters = int(cfg.get('filters', 32))
+    ks = cfg.get('kernelSize', 3)
+    kernel_size = tuple(ks) if isinstance(ks, (list, tuple)) else (int(ks), int(ks))
+    strides = cfg.get('strides', 1)
+    activation = cfg.get('activation', 'relu')
+    if first:
+        if not has_mnist:
+            raise RuntimeError('CSV 数据不支持 Conv2D 作为第一层')
+        return [layers.Conv2D(filters, kernel_size, strides=strides, activation=activation, input_shape=(28, 28, 1))]
+    return [layers.Conv2D(filters, kernel_size, strides=strides, activation=activation)]
+
+def _build_max_pooling2d(layers, cfg, first, has_mnist, feature_dim):
+    pool = cfg.get('poolSize', [2, 2])
+    strides = cfg.get('strides', [2, 2])
+    return [layers.MaxPooling2D(pool_size=tuple(pool), strides=tuple(strides))]
+
+def _build_avg_pooling2d(layers, cfg, first, has_mnist, feature_dim):
+    pool = cfg.get('poolSize', [2, 2])
+    strides = cfg.get('strides', [2, 2])
+    return [layers.AveragePooling2D(pool_size=tuple(pool), strides=tuple(strides))]
+
+def _build_flatten(layers, cfg, first, has_mnist, feature_dim):
+    return [layers.Flatten()]
+
+def _build_dense(layers, cfg, first, has_mnist, feature_dim):
+    units = int(cfg.get('units', 128))
+    activation = cfg.get('activation', 'relu')
+    if first:
+        if has_mnist:
+            return [layers.Flatten(input_shape=(28, 28, 1)), layers.Dense(units, activation=activation)]
+        return [layers.Dense(units, activation=activation, input_dim=int(feature_dim or 4))]
+    return [layers.Dense(units, activation=activation)]
+
+def _build_dropout(layers, cfg, first, has_mnist, feature_dim):
+    return [layers.Dropout(float(cfg.get('rate', 0.5)))]
+
+def _build_batch_norm(layers, cfg, first, has_mnist, feature_dim):
+    return [layers.BatchNormalization()]
+
+def _build_recurrent(layer_class_name):
+    """LSTM/GRU构建函数 (第一层输入为变长序列，特征数取CSV特征数，默认28)"""
+    def _build(layers, cfg, first, has_mnist, feature_dim):
+        layer_class = getattr(layers, layer_class_name)
+        units = int(cfg.get('units', 128))
+        return_sequences = bool(cfg.get('returnSequences', False))
+        if first:
+            feats = feature_dim if feature_dim is not None else 28
+            return [layer_class(units, return_sequences=return_sequences, input_shape=(None, int(feats)))]
+        return [layer_class(units, return_sequences=return_sequences)]
+    return _build
+
+def _build_activation(layers, cfg, first, has_mnist, feature_dim):
+    return [layers.Activation(cfg.get('activation', 'relu'))]
+
+def _build_reshape(layers, cfg, first, has_mnist, feature_dim):
+    target = _parse_shape(cfg.get('targetShape'))
+    if first and has_mnist:
+        return [layers.Reshape(tuple(target or [28, 28, 1]), input_shape=(28, 28, 1))]
+    if first:
+        return [layers.Reshape(tuple(target or [1, int(feature_dim or 4)]), input_shape=(int(feature_dim or 4),))]
+    return [layers.Reshape(tuple(target or [1, int(feature_dim or 4)]))]
+
+# 层类型 -> 构建函数
+LAYER_BUILDERS = {
+    'conv2d': _build_conv2d,
+    'maxPooling2d': _build_max_pooling2d,
+    'avgPooling2d': _build_avg_pooling2d,
+    'flatten': _build_flatten,
+    'dense': _build_dense,
+    'dropout': _build_dropout,
+    'batchNorm': _build_batch_norm,
+    'lstm': _build_recurrent('LSTM'),
+    'gru': _build_recurrent('GRU'),
+    'activation': _build_activation,
+    'reshape': _build_reshape,
+}
+
 # ==================== 模型训练 ====================
 
 @app.post("/sessions/{session_id}/train")
@@ -320,25 +712,24 @@ async def train_model(session_id: str, config: TrainingConfig):
     """训练模型"""
     try:
         # 检查是否需要预先上传数据
-        has_mnist = any(getattr(layer, 'type', '') == 'mnist' for layer in config.model_structure.layers)
-        has_csv = any(getattr(layer, 'type', '') == 'useData' for layer in config.model_structure.layers)
+        layer_types = {layer.type for layer in config.model_structure.layers}
+        has_mnist = 'mnist' in layer_types
+        has_csv = 'useData' in layer_types
 
         df = None
         if not (has_mnist or has_csv):
             # 需要上传的数据流（例如用户CSV）
-            data_info = data_processor.get_data_info(session_id)
+            data_info = await asyncio.to_thread(data_processor.get_data_info, session_id)
             if not data_info:
                 raise HTTPException(status_code=400, detail="请先上传数据")
-            df = redis_cache.get_dataframe(session_id, "raw_data")
+            # 读取和反序列化都不阻塞事件循环
+            df = await redis_cache.aget_dataframe(session_id, "raw_data")
             if df is None:
                 raise HTTPException(status_code=400, detail="未找到训练数据")
         
         # 根据框架选择转换器
-        if config.framework.lower() == "tensorflow":
-            converter = tf_converter
-        elif config.framework.lower() == "pytorch":
-            converter = pytorch_converter
-        else:
+        converter = _get_converter(config.framework.lower())
+        if converter is None:
             raise HTTPException(status_code=400, detail="不支持的框架")
         
         # 开始训练（异步）
@@ -358,252 +749,335 @@ async def train_model(session_id: str, config: TrainingConfig):
         logger.error(f"训练模型失败: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@functools.lru_cache(maxsize=1)
+def _cpu_has_amx_bf16() -> bool:
+    """CPU是否支持AMX-BF16指令 (读取/proc/cpuinfo，非Linux平台视为不支持)"""
+    try:
+        with open('/proc/cpuinfo') as f:
+            return 'amx_bf16' in f.read()
+    except OSError:
+        return False
+
+# training_params.precision 可选值对应的Keras精度策略 (auto按硬件选择)
+PRECISION_POLICIES = {
+    'fp32': 'float32',
+    'fp16': 'mixed_float16',
+    'bf16': 'mixed_bfloat16',
+}
+
+def _select_precision_policy(tf, precision: str = 'auto') -> str:
+    """
+    选择Keras全局精度策略
+    
+    precision为fp32/fp16/bf16时直接使用对应策略；auto时GPU用mixed_float16，
+    支持AMX的CPU用mixed_bfloat16，否则float32
+    """
+    if precision in PRECISION_POLICIES:
+        return PRECISION_POLICIES[precision]
+    if precision != 'auto':
+        logger.warning(f"未知的训练精度: {precision}，按auto处理")
+    if tf.config.list_physical_devices('GPU'):
+        return 'mixed_float16'
+    if _cpu_has_amx_bf16():
+        return 'mixed_bfloat16'
+    return 'float32'
+
+# 每次调用编译后的训练函数连续执行的batch数
+DEFAULT_STEPS_PER_EXECUTION = 8
+
+# batch_size为"auto"时依次试跑的候选值，以及按 (模型结构, 输入形状, 设备) 缓存的探测结果
+AUTO_BATCH_SIZES = (32, 64, 128, 256, 512, 1024)
+_auto_batch_sizes: Dict[tuple, int] = {}
+
+def _auto_batch_size(tf, model, x_train, y_train, model_signature: str) -> int:
+    """
+    在模型副本上逐级加倍batch大小试跑一个训练步，返回未出现显存/内存不足的最大值
+    
+    副本使用独立的权重和优化器，试跑不影响正式训练；同一结构在同一设备上只探测一次
+    """
+    device = 'GPU' if tf.config.list_physical_devices('GPU') else 'CPU'
+    key = (model_signature, x_train.shape[1:], device)
+    if key in _auto_batch_sizes:
+        return _auto_batch_sizes[key]
+    
+    probe = tf.keras.models.clone_model(model)
+    probe.compile(optimizer=tf.keras.optimizers.Adam(),
+                  loss='categorical_crossentropy',
+                  jit_compile=getattr(model, 'jit_compile', False))
+    best = AUTO_BATCH_SIZES[0]
+    for batch_size in AUTO_BATCH_SIZES:
+        if batch_size > len(x_train):
+            break
+        try:
+            probe.train_on_batch(x_train[:batch_size], y_train[:batch_size])
+        except tf.errors.ResourceExhaustedError:
+            break
+        best = batch_size
+    del probe
+    
+    _auto_batch_sizes[key] = best
+    logger.info(f"自动选择batch大小: {best} ({device})")
+    return best
+
+def _scale_images(images: np.ndarray) -> np.ndarray:
+    """uint8图像缩放到[0, 1]并添加通道维度 (只分配一次结果数组，类型转换和除法在同一遍中完成)"""
+    scaled = np.empty(images.shape + (1,), dtype=np.float32)
+    np.divide(images, np.float32(255.0), out=scaled[..., 0])
+    return scaled
+
+@functools.lru_cache(maxsize=1)
+def _load_mnist_preprocessed():
+    """加载并预处理MNIST (缩放、添加通道维度、标签one-hot)，所有训练共享同一份只读数组"""
+    import tensorflow as tf
+
+    (x_train, y_train), (x_test, y_test) = tf.keras.datasets.mnist.load_data()
+    arrays = (
+        _scale_images(x_train),
+        tf.keras.utils.to_categorical(y_train, 10),
+        _scale_images(x_test),
+        tf.keras.utils.to_categorical(y_test, 10),
+    )
+    for array in arrays:
+        array.setflags(write=False)
+    return arrays
+
 async def _train_model_async(session_id: str, df, config: TrainingConfig, converter):
     """异步训练模型（TensorFlow 实训 + TensorBoard 日志）"""
     try:
-        await manager.send_message(session_id, {
-            "type": "training_status",
-            "status": "started",
-            "message": "开始训练模型"
-        })
+        await manager.send_payload(session_id, _TRAINING_STARTED_PAYLOAD)
         
-        # 数据源判断
-        has_mnist = any(getattr(layer, 'type', '') == 'mnist' for layer in config.model_structure.layers)
-        has_csv = any(getattr(layer, 'type', '') == 'useData' for layer in config.model_structure.layers)
+        # 层类型和配置只读取一次，数据源判断和模型构建共用
+        layer_specs = [(l.type, l.config or {}) for l in config.model_structure.layers]
+        has_mnist = any(layer_type == 'mnist' for layer_type, _ in layer_specs)
+        has_csv = any(layer_type == 'useData' for layer_type, _ in layer_specs)
 
-        # 仅实现 TF 实训
-        try:
-            import tensorflow as tf
-            from tensorflow.keras import layers, models
-        except Exception as e:
-            raise RuntimeError("后端未安装 TensorFlow，请安装 requirements_ml.txt 后重试") from e
-
-        # TensorBoard 日志（包含图、直方图、profile trace）
-        logdir = os.path.join("runs", session_id, datetime.now().strftime("%Y%m%d-%H%M%S"))
-        os.makedirs(logdir, exist_ok=True)
-        tb_callback = tf.keras.callbacks.TensorBoard(
-            log_dir=logdir,
-            histogram_freq=1,
-            write_graph=True,
-            write_images=False,
-            update_freq='batch',
-            profile_batch='2,5'  # 对第2到5个batch做性能trace
-        )
-
-        # 解析结构并构建模型（覆盖常用层）
-        def _parse_shape(val):
-            if isinstance(val, (list, tuple)):
-                return list(val)
-            if isinstance(val, str):
-                s = val.replace('(', '').replace(')', '')
-                parts = [p.strip() for p in s.split(',') if p.strip()]
-                out = []
-                for p in parts:
-                    if p.lower() in ("none", "null"):
-                        out.append(None)
-                    else:
-                        try:
-                            out.append(int(p))
-                        except Exception:
-                            out.append(None)
-                return out
-            return None
+        loop = asyncio.get_running_loop()
 
-        proc_layers = [l for l in config.model_structure.layers if l.type not in ("mnist", "useData")]
-        model = models.Sequential()
-        first = True
-        feature_dim = None
+        # CSV标签列只编码一次 (类别按值排序，缺失值也作为一个类别)，
+        # 自动添加的输出层和one-hot目标使用同一个类别数
+        y_idx = None
+        num_csv_classes = None
         if has_csv and df is not None:
-            feature_dim = df.shape[1] - 1 if df.shape[1] > 1 else 1
-
-        for l in proc_layers:
-            t = l.type
-            cfg = l.config or {}
-            if t == 'conv2d':
-                filters = int(cfg.get('filters', 32))
-                ks = cfg.get('kernelSize', 3)
-                kernel_size = tuple(ks) if isinstance(ks, (list, tuple)) else (int(ks), int(ks))
-                strides = cfg.get('strides', 1)
-                activation = cfg.get('activation', 'relu')
-                if first:
-                    if has_mnist:
-                        model.add(layers.Conv2D(filters, kernel_size, strides=strides, activation=activation, input_shape=(28, 28, 1)))
-                    else:
-                        raise RuntimeError('CSV 数据不支持 Conv2D 作为第一层')
-                else:
-                    model.add(layers.Conv2D(filters, kernel_size, strides=strides, activation=activation))
-            elif t == 'maxPooling2d':
-                pool = cfg.get('poolSize', [2, 2])
-                strides = cfg.get('strides', [2, 2])
-                model.add(layers.MaxPooling2D(pool_size=tuple(pool), strides=tuple(strides)))
-            elif t == 'avgPooling2d':
-                pool = cfg.get('poolSize', [2, 2])
-                strides = cfg.get('strides', [2, 2])
-                model.add(layers.AveragePooling2D(pool_size=tuple(pool), strides=tuple(strides)))
-            elif t == 'flatten':
-                model.add(layers.Flatten())
-            elif t == 'dense':
-                units = int(cfg.get('units', 128))
-                activation = cfg.get('activation', 'relu')
-                if first:
-                    if has_mnist:
-                        model.add(layers.Flatten(input_shape=(28, 28, 1)))
-                        model.add(layers.Dense(units, activation=activation))
-                    else:
-                        if feature_dim is None:
-                            feature_dim = 4
-                        model.add(layers.Dense(units, activation=activation, input_dim=int(feature_dim)))
-                else:
-                    model.add(layers.Dense(units, activation=activation))
-            elif t == 'dropout':
-                rate = float(cfg.get('rate', 0.5))
-                model.add(layers.Dropout(rate))
-            elif t == 'batchNorm':
-                model.add(layers.BatchNormalization())
-            elif t == 'lstm':
-                units = int(cfg.get('units', 128))
-                return_sequences = bool(cfg.get('returnSequences', False))
-                if first:
-                    steps = None
-                    feats = feature_dim if feature_dim is not None else 28
-                    model.add(layers.LSTM(units, return_sequences=return_sequences, input_shape=(steps, int(feats))))
-                else:
-                    model.add(layers.LSTM(units, return_sequences=return_sequences))
-            elif t == 'gru':
-                units = int(cfg.get('units', 128))
-                return_sequences = bool(cfg.get('returnSequences', False))
-                if first:
-                    steps = None
-                    feats = feature_dim if feature_dim is not None else 28
-                    model.add(layers.GRU(units, return_sequences=return_sequences, input_shape=(steps, int(feats))))
-                else:
-                    model.add(layers.GRU(units, return_sequences=return_sequences))
-            elif t == 'activation':
-                activation = cfg.get('activation', 'relu')
-                model.add(layers.Activation(activation))
-            elif t == 'reshape':
-                target = _parse_shape(cfg.get('targetShape'))
-                if first:
-                    if has_mnist:
-                        model.add(layers.Reshape(tuple(target or [28, 28, 1]), input_shape=(28, 28, 1)))
-                    else:
-                        if feature_dim is None:
-                            feature_dim = 4
-                        model.add(layers.Reshape(tuple(target or [1, int(feature_dim)]), input_shape=(int(feature_dim),)))
-                else:
-                    model.add(layers.Reshape(tuple(target or [1, int(feature_dim or 4)])))
-            else:
-                logger.warning(f"未支持的层类型: {t}")
+            y_idx, classes = await loop.run_in_executor(
+                _training_pool, functools.partial(df.iloc[:, -1].factorize, sort=True, use_na_sentinel=False))
+            num_csv_classes = max(len(classes), 2)
 
-            if first:
+        # 导入TensorFlow和构建/编译模型都是阻塞操作 (首次导入需数秒)，在训练线程池中执行
+        def _build_model():
+            # 仅实现 TF 实训
+            try:
+                import tensorflow as tf
+                from tensorflow.keras import layers, models
+            except Exception as e:
+                raise RuntimeError("后端未安装 TensorFlow，请安装 requirements_ml.txt 后重试") from e
+
+            # 混合精度: 激活和梯度用半精度计算，变量保持float32 (策略为进程级全局设置，每次构建前在锁内重新设置)
+            # mixed_precision=false 与 precision=fp32 等价 (兼容旧参数)
+            precision = str(config.training_params.get('precision', 'auto')).lower()
+            if not config.training_params.get('mixed_precision', True):
+                precision = 'fp32'
+            precision_policy = _select_precision_policy(tf, precision)
+            tf.keras.mixed_precision.set_global_policy(precision_policy)
+            mixed_precision = precision_policy != 'float32'
+            logger.info(f"训练精度策略: {precision_policy}")
+
+            # TensorBoard 日志: 权重直方图、模型图和profile trace有额外开销，默认关闭，
+            # 通过 training_params.tensorboard 按需开启 (如 {"histogram_freq": 1, "profile_batch": "2,5"})
+            tb_cfg = config.training_params.get('tensorboard') or {}
+            logdir = os.path.join("runs", session_id, datetime.now().strftime("%Y%m%d-%H%M%S"))
+            os.makedirs(logdir, exist_ok=True)
+            tb_callback = tf.keras.callbacks.TensorBoard(
+                log_dir=logdir,
+                histogram_freq=int(tb_cfg.get('histogram_freq', 0)),
+                write_graph=bool(tb_cfg.get('write_graph', False)),
+                write_images=False,
+                update_freq=tb_cfg.get('update_freq', 'batch'),
+                profile_batch=tb_cfg.get('profile_batch', 0)  # 0表示不做性能trace
+            )
+
+            # 解析结构并构建模型（覆盖常用层）
+            proc_specs = [(layer_type, cfg) for layer_type, cfg in layer_specs if layer_type not in ("mnist", "useData")]
+            model = models.Sequential()
+            first = True
+            feature_dim = None
+            if has_csv and df is not None:
+                feature_dim = df.shape[1] - 1 if df.shape[1] > 1 else 1
+
+            for layer_type, cfg in proc_specs:
+                builder = LAYER_BUILDERS.get(layer_type)
+                if builder is None:
+                    logger.warning(f"未支持的层类型: {layer_type}")
+                else:
+                    for layer in builder(layers, cfg, first, has_mnist, feature_dim):
+                        model.add(layer)
                 first = False
 
-        # 检查模型是否需要输出层，如果最后一层不是正确的分类层，自动添加
-        if len(model.layers) > 0:
-            last_layer = model.layers[-1]
+            # 检查模型是否需要输出层，如果最后一层不是正确的分类层，自动添加
+            if len(model.layers) > 0:
+                last_layer = model.layers[-1]
             
-            # 确定目标类别数
-            if has_mnist:
-                num_classes = 10
-                # 检查最后一层是否是正确的分类层
-                needs_classification_layer = True
+                # 确定目标类别数
+                if has_mnist:
+                    num_classes = 10
+                    # 检查最后一层是否是正确的分类层
+                    needs_classification_layer = True
                 
-                if isinstance(last_layer, tf.keras.layers.Dense):
-                    if (last_layer.units == num_classes and 
-                        hasattr(last_layer.activation, '__name__') and
-                        last_layer.activation.__name__ == 'softmax'):
-                        needs_classification_layer = False
+                    if isinstance(last_layer, tf.keras.layers.Dense):
+                        if (last_layer.units == num_classes and 
+                            hasattr(last_layer.activation, '__name__') and
+                            last_layer.activation.__name__ == 'softmax'):
+                            needs_classification_layer = False
                 
-                if needs_classification_layer:
-                    # 检查是否需要添加Flatten层
-                    # 对于卷积层、池化层等，需要先Flatten
-                    layer_types_need_flatten = (
-                        tf.keras.layers.Conv2D,
-                        tf.keras.layers.MaxPooling2D, 
-                        tf.keras.layers.AveragePooling2D,
-                        tf.keras.layers.BatchNormalization
-                    )
+                    if needs_classification_layer:
+                        # 检查是否需要添加Flatten层
+                        # 对于卷积层、池化层等，需要先Flatten
+                        layer_types_need_flatten = (
+                            tf.keras.layers.Conv2D,
+                            tf.keras.layers.MaxPooling2D, 
+                            tf.keras.layers.AveragePooling2D,
+                            tf.keras.layers.BatchNormalization
+                        )
                     
-                    if (isinstance(last_layer, layer_types_need_flatten) or
-                        (hasattr(last_layer, '__class__') and 
-                         any(name in last_layer.__class__.__name__.lower() 
-                             for name in ['conv', 'pool', 'batch']))):
-                        model.add(layers.Flatten())
-                        logger.info("自动添加Flatten层")
+                        if (isinstance(last_layer, layer_types_need_flatten) or
+                            (hasattr(last_layer, '__class__') and 
+                             any(name in last_layer.__class__.__name__.lower() 
+                                 for name in ['conv', 'pool', 'batch']))):
+                            model.add(layers.Flatten())
+                            logger.info("自动添加Flatten层")
                     
-                    model.add(layers.Dense(num_classes, activation='softmax', name='classification_output'))
-                    logger.info(f"自动添加分类输出层: {num_classes} 类")
+                        model.add(layers.Dense(num_classes, activation='softmax', name='classification_output', dtype='float32'))
+                        logger.info(f"自动添加分类输出层: {num_classes} 类")
             
-            elif has_csv and df is not None:
-                # 对于CSV数据，根据实际标签数确定类别
-                y_raw = df.values[:, -1]
-                num_classes = len(np.unique(y_raw))
+                elif has_csv and df is not None:
+                    # 对于CSV数据，根据实际标签数确定类别
+                    num_classes = num_csv_classes
                 
-                needs_classification_layer = True
+                    needs_classification_layer = True
                 
-                if isinstance(last_layer, tf.keras.layers.Dense):
-                    if (last_layer.units == num_classes and 
-                        hasattr(last_layer.activation, '__name__') and
-                        last_layer.activation.__name__ == 'softmax'):
-                        needs_classification_layer = False
+                    if isinstance(last_layer, tf.keras.layers.Dense):
+                        if (last_layer.units == num_classes and 
+                            hasattr(last_layer.activation, '__name__') and
+                            last_layer.activation.__name__ == 'softmax'):
+                            needs_classification_layer = False
                 
-                if needs_classification_layer:
-                    # CSV数据通常不需要Flatten，但为了安全起见还是检查
-                    if not isinstance(last_layer, tf.keras.layers.Dense):
-                        model.add(layers.Flatten())
-                        logger.info("自动添加Flatten层")
+                    if needs_classification_layer:
+                        # CSV数据通常不需要Flatten，但为了安全起见还是检查
+                        if not isinstance(last_layer, tf.keras.layers.Dense):
+                            model.add(layers.Flatten())
+                            logger.info("自动添加Flatten层")
                     
-                    model.add(layers.Dense(num_classes, activation='softmax', name='classification_output'))
-                    logger.info(f"自动添加分类输出层: {num_classes} 类")
-
-        # 编译
-        lr = float(config.training_params.get('learning_rate', 0.001))
-        model.compile(optimizer=tf.keras.optimizers.Adam(learning_rate=lr),
-                      loss='categorical_crossentropy',
-                      metrics=['accuracy'])
+                        model.add(layers.Dense(num_classes, activation='softmax', name='classification_output', dtype='float32'))
+                        logger.info(f"自动添加分类输出层: {num_classes} 类")
+
+                # 用户自定义的输出层在混合精度下输出半精度，转回float32保证softmax+loss的数值稳定
+                if mixed_precision and model.layers[-1].dtype_policy.compute_dtype != 'float32':
+                    model.add(layers.Activation('linear', dtype='float32', name='output_float32'))
+
+            # 编译 (mixed_float16下Keras会自动为优化器加上损失缩放)
+            # XLA把卷积/矩阵乘与激活等算子融合为单个内核；CPU上收益不稳定，只在有GPU时开启
+            lr = float(config.training_params.get('learning_rate', 0.001))
+            jit_compile = (bool(config.training_params.get('xla', True))
+                           and bool(tf.config.list_physical_devices('GPU')))
+            # 训练步由Keras编译为图函数执行；每次调用图函数连续执行多个batch，
+            # 减少小模型上每个batch的Python调度开销 (回调按每次调用触发)
+            model.compile(optimizer=tf.keras.optimizers.Adam(learning_rate=lr),
+                          loss='categorical_crossentropy',
+                          metrics=['accuracy'],
+                          run_eagerly=False,
+                          steps_per_execution=int(config.training_params.get(
+                              'steps_per_execution', DEFAULT_STEPS_PER_EXECUTION)),
+                          jit_compile=jit_compile)
+            return tf, model, tb_callback, logdir
+
+        def _build_model_locked():
+            with _model_build_lock:
+                return _build_model()
+
+        tf, model, tb_callback, logdir = await loop.run_in_executor(_training_pool, _build_model_locked)
+
+        # 数据 (加载和转换是阻塞操作，在线程池中执行)
+        def _prepare_data():
+            if has_mnist:
+                x_train, y_train, x_test, y_test = _load_mnist_preprocessed()
+            elif has_csv and df is not None:
+                # 特征列直接转换为float32，不经过整表的object数组
+                X = df.iloc[:, :-1].to_numpy(dtype='float32')
+                y_cat = tf.keras.utils.to_categorical(y_idx, num_csv_classes)
+                n = X.shape[0]
+                split = int(n * 0.8)
+                x_train, x_test = X[:split], X[split:]
+                y_train, y_test = y_cat[:split], y_cat[split:]
+            else:
+                raise RuntimeError('未检测到数据源节点，或数据不可用')
+            return x_train, y_train, x_test, y_test
 
-        # 数据
-        if has_mnist:
-            (x_train, y_train), (x_test, y_test) = tf.keras.datasets.mnist.load_data()
-            x_train = x_train.astype('float32') / 255.0
-            x_test = x_test.astype('float32') / 255.0
-            x_train = np.expand_dims(x_train, -1)
-            x_test = np.expand_dims(x_test, -1)
-            y_train = tf.keras.utils.to_categorical(y_train, 10)
-            y_test = tf.keras.utils.to_categorical(y_test, 10)
-        elif has_csv and df is not None:
-            data_np = df.values
-            X = data_np[:, :-1]
-            y_raw = data_np[:, -1]
-            classes = np.unique(y_raw)
-            class_to_idx = {c: i for i, c in enumerate(classes)}
-            y_idx = np.vectorize(lambda v: class_to_idx.get(v, 0))(y_raw)
-            num_classes = max(len(classes), 2)
-            y_cat = tf.keras.utils.to_categorical(y_idx, num_classes)
-            n = X.shape[0]
-            split = int(n * 0.8)
-            x_train, x_test = X[:split].astype('float32'), X[split:].astype('float32')
-            y_train, y_test = y_cat[:split], y_cat[split:]
-        else:
-            raise RuntimeError('未检测到数据源节点，或数据不可用')
+        x_train, y_train, x_test, y_test = await loop.run_in_executor(_training_pool, _prepare_data)
 
         epochs = int(config.training_params.get('epochs', 10))
-        batch_size = int(config.training_params.get('batch_size', 32))
+        batch_size = config.training_params.get('batch_size', 32)
+        if batch_size == 'auto':
+            model_signature = json.dumps(layer_specs, sort_keys=True, default=str)
+            batch_size = await loop.run_in_executor(
+                _training_pool, _auto_batch_size, tf, model, x_train, y_train, model_signature)
+        batch_size = int(batch_size)
+
+        # 训练线程中的进度回调只入队，由单个任务合并后推送
+        progress_queue: asyncio.Queue = asyncio.Queue()
+        progress_task = asyncio.create_task(manager.forward_progress(session_id, progress_queue))
+
+        class _ProgressCallback(tf.keras.callbacks.Callback):
+            def _report(self, epoch, batch, logs):
+                message = {
+                    "type": "training_progress",
+                    "epoch": epoch + 1,
+                    "epochs": epochs,
+                    "batch": batch,
+                    "steps": self.params.get("steps"),
+                    "logs": {key: float(value) for key, value in (logs or {}).items()}
+                }
+                loop.call_soon_threadsafe(progress_queue.put_nowait, message)
 
-        loop = asyncio.get_running_loop()
+            def on_epoch_begin(self, epoch, logs=None):
+                self._epoch = epoch
+
+            def on_train_batch_end(self, batch, logs=None):
+                self._report(self._epoch, batch + 1, logs)
+
+            def on_epoch_end(self, epoch, logs=None):
+                self._report(epoch, None, logs)
 
         def _fit():
+            # tf.data流水线: 下一批数据的准备与当前训练步重叠执行
+            # (训练数据每轮重新打乱，不要求确定性的产出顺序)
+            options = tf.data.Options()
+            options.deterministic = False
+            train_ds = (
+                tf.data.Dataset.from_tensor_slices((x_train, y_train))
+                .shuffle(min(len(x_train), 10000), reshuffle_each_iteration=True)
+                .batch(batch_size)
+                .prefetch(tf.data.AUTOTUNE)
+                .with_options(options)
+            )
+            # 验证数据顺序固定，分批结果在第一轮后缓存，之后各轮直接复用
+            val_ds = (
+                tf.data.Dataset.from_tensor_slices((x_test, y_test))
+                .batch(batch_size)
+                .cache()
+                .prefetch(tf.data.AUTOTUNE)
+            )
             return model.fit(
-                x_train,
-                y_train,
-                validation_data=(x_test, y_test),
+                train_ds,
+                validation_data=val_ds,
                 epochs=epochs,
-                batch_size=batch_size,
-                callbacks=[tb_callback],
+                callbacks=[tb_callback, _ProgressCallback()],
                 verbose=1
             )
 
-        await loop.run_in_executor(None, _fit)
+        try:
+            await loop.run_in_executor(_training_pool, _fit)
+        finally:
+            progress_queue.put_nowait(None)
+            await progress_task
 
         await manager.send_message(session_id, {
             "type": "training_status",
@@ -632,13 +1106,13 @@ async def websocket_endpoint(websocket: WebSocket, session_id: str):
         while True:
             # 接收客户端消息
             data = await websocket.receive_text()
-            message = json.loads(data)
+            message = _loads_message(data)
             
             # 处理客户端消息
             if message.get("type") == "ping":
                 await manager.send_message(session_id, {
                     "type": "pong",
-                    "timestamp": datetime.now().isoformat()
+                    "timestamp": _now_iso()
                 })
             
     except WebSocketDisconnect:
@@ -667,6 +1141,8 @@ async def cleanup_cache():
     """清理过期缓存"""
     try:
         cleaned_count = redis_cache.cleanup_expired_sessions()
+        session_info_cache.clear()
+        active_sessions_cache.clear()
         return {
             "success": True,
             "cleaned_sessions": cleaned_count,
@@ -678,15 +1154,43 @@ async def cleanup_cache():
 
 # ==================== 新增层组件API ====================
 
+# 层信息在部署期间不变: 响应体只生成、序列化一次，并带ETag供客户端条件请求
+LAYERS_CACHE_CONTROL = "public, max-age=3600"
+
+def _static_json(content: dict) -> tuple:
+    """序列化响应内容，返回 (响应体bytes, ETag)"""
+    body = APIResponse(content).body
+    return body, f'"{hashlib.md5(body).hexdigest()}"'
+
+@functools.lru_cache(maxsize=1)
+def _layers_response() -> tuple:
+    return _static_json({
+        "success": True,
+        "layers": model_builder.get_available_layers()
+    })
+
+@functools.lru_cache(maxsize=256)
+def _layer_info_response(layer_type: str) -> Optional[tuple]:
+    layer_info = model_builder.get_layer_info(layer_type)
+    if not layer_info:
+        return None
+    return _static_json({
+        "success": True,
+        "layer_info": layer_info
+    })
+
+def _cached_json_response(request: Request, body: bytes, etag: str) -> Response:
+    """返回预先序列化的响应体；If-None-Match与ETag一致时返回304"""
+    headers = {"ETag": etag, "Cache-Control": LAYERS_CACHE_CONTROL}
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers=headers)
+    return Response(body, media_type="application/json", headers=headers)
+
 @app.get("/layers")
-async def get_available_layers():
+async def get_available_layers(request: Request):
     """获取所有可用的层组件"""
     try:
-        layers_info = model_builder.get_available_layers()
-        return {
-            "success": True,
-            "layers": layers_info
-        }
+        return _cached_json_response(request, *_layers_response())
     except Exception as e:
         import traceback
         error_detail = traceback.format_exc()
@@ -694,17 +1198,14 @@ async def get_available_layers():
         raise HTTPException(status_code=500, detail=f"获取层信息失败: {str(e)}")
 
 @app.get("/layers/{layer_type}")
-async def get_layer_info(layer_type: str):
+async def get_layer_info(layer_type: str, request: Request):
     """获取特定层的详细信息"""
     try:
-        layer_info = model_builder.get_layer_info(layer_type)
-        if not layer_info:
+        cached = _layer_info_response(layer_type)
+        if cached is None:
             raise HTTPException(status_code=404, detail=f"层类型 '{layer_type}' 不存在")
         
-        return {
-            "success": True,
-            "layer_info": layer_info
-        }
+        return _cached_json_response(request, *cached)
     except HTTPException:
         raise
     except Exception as e:
@@ -717,11 +1218,45 @@ class ModelConfig(BaseModel):
     layers: List[Dict[str, Any]]
     framework: str = "tensorflow"
 
+# 模型构建/分析结果只由模型配置决定，在UI中反复调整时常提交相同配置:
+# 按配置内容哈希缓存结果，进程内命中直接返回，多工作进程之间通过Redis共享
+MODEL_RESULT_CACHE_MAXSIZE = 512
+MODEL_RESULT_CACHE_TTL = 3600
+model_result_cache = _TTLCache(MODEL_RESULT_CACHE_MAXSIZE, MODEL_RESULT_CACHE_TTL)
+
+def _model_config_digest(model_config: dict) -> str:
+    """模型配置的内容哈希 (键排序后序列化，与字段顺序无关)"""
+    if HAS_ORJSON:
+        data = orjson.dumps(model_config, option=orjson.OPT_SORT_KEYS)
+    else:
+        data = json.dumps(model_config, sort_keys=True, separators=(",", ":")).encode("utf-8")
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+async def _cached_model_result(kind: str, model_config: dict, build) -> dict:
+    """
+    按配置哈希获取 model_builder 的结果，未命中时在线程中调用 build 计算
+    
+    只缓存成功的结果，失败结果不写入缓存，下次提交重新计算
+    """
+    key = f"model:{kind}:{_model_config_digest(model_config)}"
+    result = model_result_cache.get(key)
+    if result is not None:
+        return result
+    
+    result = await redis_cache.aget_shared(key)
+    if result is None:
+        result = await asyncio.to_thread(build, model_config)
+        if not result.get('success'):
+            return result
+        await redis_cache.astore_shared(key, result, MODEL_RESULT_CACHE_TTL)
+    model_result_cache.set(key, result)
+    return result
+
 @app.post("/models/validate")
 async def validate_model(config: ModelConfig):
     """验证模型配置"""
     try:
-        model_config = config.dict()
+        model_config = config.model_dump()
         validation_result = model_builder.validate_model_config(model_config)
         
         return {
@@ -741,11 +1276,11 @@ async def validate_model(config: ModelConfig):
 async def build_tensorflow_model(config: ModelConfig):
     """构建TensorFlow模型代码"""
     try:
-        model_config = config.dict()
-        result = model_builder.build_tensorflow_model(model_config)
+        model_config = config.model_dump()
+        result = await _cached_model_result("tf", model_config, model_builder.build_tensorflow_model)
         
         if not result['success']:
-            return JSONResponse(
+            return APIResponse(
                 status_code=400,
                 content={
                     "success": False,
@@ -769,11 +1304,11 @@ async def build_tensorflow_model(config: ModelConfig):
 async def build_pytorch_model(config: ModelConfig):
     """构建PyTorch模型代码"""
     try:
-        model_config = config.dict()
-        result = model_builder.build_pytorch_model(model_config)
+        model_config = config.model_dump()
+        result = await _cached_model_result("torch", model_config, model_builder.build_pytorch_model)
         
         if not result['success']:
-            return JSONResponse(
+            return APIResponse(
                 status_code=400,
                 content={
                     "success": False,
@@ -797,11 +1332,11 @@ async def build_pytorch_model(config: ModelConfig):
 async def analyze_model_complexity(config: ModelConfig):
     """分析模型复杂度"""
     try:
-        model_config = config.dict()
-        result = model_builder.analyze_model_complexity(model_config)
+        model_config = config.model_dump()
+        result = await _cached_model_result("analyze", model_config, model_builder.analyze_model_complexity)
         
         if not result['success']:
-            return JSONResponse(
+            return APIResponse(
                 status_code=400,
                 content={
                     "success": False,
@@ -826,7 +1361,7 @@ async def global_exception_handler(request, exc):
     import traceback
     error_detail = traceback.format_exc()
     logger.error(f"未处理的异常: {exc}\n{error_detail}")
-    return JSONResponse(
+    return APIResponse(
         status_code=500,
         content={
             "success": False,
@@ -835,12 +1370,32 @@ async def global_exception_handler(request, exc):
         }
     )
 
+def uvicorn_run_options() -> Dict[str, Any]:
+    """
+    uvicorn启动参数 (ml_backend 直接运行和各启动脚本共用)
+    
+    DEV=1 时单进程并监视文件自动重载。默认单worker: TensorFlow训练在进程内执行，
+    多个worker会各自初始化运行时并争用GPU显存，会话缓存的失效也只在本进程生效；
+    显式设置 WORKERS 时按该值启动多worker (worker间的会话数据和WebSocket消息经Redis共享，
+    Redis不可用时只能单进程)
+    """
+    dev_mode = os.getenv("DEV") == "1"
+    workers = int(os.getenv("WORKERS", 1))
+    if not redis_cache._is_redis_available():
+        workers = 1
+    return dict(
+        reload=dev_mode,
+        workers=1 if dev_mode else workers,
+        loop=UVICORN_LOOP,
+        http=UVICORN_HTTP
+    )
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(
         "ml_backend:app",
         host="0.0.0.0",
         port=8000,
-        reload=True,
-        log_level="info"
-    ) 
\ No newline at end of file
+        log_level="info",
+        **uvicorn_run_options()
+    )
@@ -4,9 +4,8 @@ TensorFlow Model Converter
 """
 
 import numpy as np
-from typing import List, Dict, Any, Callable, Optional
+from typing import List, Dict, Any, Optional
 import logging
-import asyncio
 import json
 import os
 from datetime import datetime
@@ -406,41 +405,6 @@ if __name__ == "__main__":
     model, history = main()
 """
         
-    async def train_model_async(self, session, training_config, progress_callback: Callable = None):
-        """异步训练模型"""
-        try:
-            session.is_training = True
-            logger.info(f"开始异步训练会话 {session.session_id}")
-            
-            # 这里应该执行实际的模型训练
-            # 为了演示，我们模拟训练过程
-            epochs = training_config.epochs
-            
-            for epoch in range(epochs):
-                # 模拟训练进度
-                progress = (epoch + 1) / epochs
-                
-                if progress_callback:
-                    await progress_callback({
-                        'epoch': epoch + 1,
-                        'total_epochs': epochs,
-                        'progress': progress,
-                        'loss': 0.5 * (1 - progress) + 0.1,  # 模拟损失下降
-                        'accuracy': 0.6 + 0.3 * progress  # 模拟准确率提升
-                    })
-                
-                # 模拟训练时间
-                await asyncio.sleep(1)
-                
-            session.is_training = False
-            session.training_progress = 1.0
-            logger.info(f"会话 {session.session_id} 训练完成")
-            
-        except Exception as e:
-            session.is_training = False
-            logger.error(f"异步训练失败: {e}")
-            raise
-            
     def predict(self, model, data: List[List[float]]) -> List[List[float]]:
         """执行预测"""
         # 这里应该使用实际的训练好的模型进行预测
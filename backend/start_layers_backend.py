@@ -104,15 +104,9 @@ def start_server():
         logger.info("API文档: http://localhost:8000/docs")
         logger.info("按 Ctrl+C 停止服务器")
         
-        # 启动uvicorn服务器
-        subprocess.run([
-            sys.executable, "-m", "uvicorn",
-            "ml_backend:app",
-            "--host", "0.0.0.0",
-            "--port", "8000",
-            "--reload",
-            "--log-level", "info"
-        ])
+        # 启动uvicorn服务器 (reload/workers/loop/http由 ml_backend.uvicorn_run_options 统一决定，
+        # DEV=1 时自动重载)
+        subprocess.run([sys.executable, str(Path(__file__).parent / "ml_backend.py")])
         
     except KeyboardInterrupt:
         logger.info("服务器已停止")
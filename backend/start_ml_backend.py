@@ -22,6 +22,12 @@ def check_dependencies():
         logger.error("✗ FastAPI 未安装，请运行: pip install -r requirements_ml.txt")
         return False
         
+    try:
+        import uvloop
+        logger.info("✓ uvloop 已安装，使用uvloop事件循环")
+    except ImportError:
+        logger.warning("⚠ uvloop 未安装，将使用标准asyncio事件循环")
+        
     try:
         import tensorflow as tf
         logger.info(f"✓ TensorFlow {tf.__version__} 已安装")
@@ -55,14 +61,11 @@ def main():
         logger.info("API文档: http://localhost:8000/docs")
         logger.info("按 Ctrl+C 停止服务器")
         
-        # 启动uvicorn服务器
+        # 启动uvicorn服务器 (reload/workers/loop/http由 ml_backend.uvicorn_run_options 统一决定，
+        # DEV=1 时自动重载)
         subprocess.run([
-            sys.executable, "-m", "uvicorn", 
-            "ml_backend:app", 
-            "--host", "0.0.0.0", 
-            "--port", "8000", 
-            "--reload",
-            "--log-level", "info"
+            sys.executable,
+            os.path.join(os.path.dirname(os.path.abspath(__file__)), "ml_backend.py")
         ])
         
     except KeyboardInterrupt:
@@ -89,15 +89,16 @@ def start_backend():
     
     try:
         import uvicorn
-        from ml_backend import app
+        from ml_backend import uvicorn_run_options
         
+        # 多worker/自动重载都需要以导入字符串指定应用
         uvicorn.run(
-            app,
+            "ml_backend:app",
             host="0.0.0.0",
             port=8000,
-            reload=True,
             log_level="info",
-            access_log=True
+            access_log=True,
+            **uvicorn_run_options()
         )
     except ImportError:
         logger.error("❌ FastAPI/Uvicorn未安装，请先安装依赖")